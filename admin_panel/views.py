@@ -10,7 +10,6 @@ from django.contrib.auth.models import User
 from django.contrib import messages
 from django.http import JsonResponse
 from django.views.decorators.csrf import csrf_exempt
-from django.core.paginator import Paginator
 from functools import wraps
 import json
 import os
@@ -20,6 +19,66 @@ from adver.models import AdLocation
 from itinerary.models import TripPlan
 
 
+ADMIN_PAGE_SIZE = 20
+
+
+class KeysetPage:
+    """
+    One page of an admin list, newest (highest id) first
+    Pages are addressed by ?after=<id> / ?before=<id> or ?last=1 instead of a page
+    number, so no page needs an OFFSET scan, and only the first one a COUNT(*).
+    """
+    
+    def __init__(self, queryset, params, per_page=ADMIN_PAGE_SIZE):
+        self.queryset = queryset
+        try:
+            after = int(params['after']) if params.get('after') else None
+            before = int(params['before']) if params.get('before') else None
+        except ValueError:
+            after = before = None
+        self.is_first = after is None and before is None and not params.get('last')
+        
+        if after is not None:
+            rows = list(queryset.filter(id__lt=after).order_by('-id')[:per_page + 1])
+            self.has_next, self.has_previous = len(rows) > per_page, True
+        elif before is not None or params.get('last'):
+            if before is not None:
+                queryset = queryset.filter(id__gt=before)
+            rows = list(queryset.order_by('id')[:per_page + 1])
+            self.has_next, self.has_previous = before is not None, len(rows) > per_page
+            rows = rows[:per_page][::-1]
+        else:
+            rows = list(queryset.order_by('-id')[:per_page + 1])
+            self.has_next, self.has_previous = len(rows) > per_page, False
+        
+        self.object_list = rows[:per_page]
+        self.has_next = self.has_next and bool(self.object_list)
+        self.has_previous = self.has_previous and bool(self.object_list)
+    
+    def __iter__(self):
+        return iter(self.object_list)
+    
+    def __len__(self):
+        return len(self.object_list)
+    
+    def has_other_pages(self):
+        return self.has_next or self.has_previous
+    
+    def total_count(self):
+        """Rows in the whole list on the first page, None on the others"""
+        if not self.is_first:
+            return None
+        if not self.has_next:
+            return len(self.object_list)
+        return self.queryset.count()
+    
+    def next_after(self):
+        return self.object_list[-1].id
+    
+    def previous_before(self):
+        return self.object_list[0].id
+
+
 def admin_required(view_func):
     """Decorator to check if admin is authenticated via session"""
     @wraps(view_func)
@@ -134,14 +193,10 @@ def admin_dashboard_view(request):
 @admin_required
 def gi_locations_view(request):
     """Manage GI Locations"""
-    locations = GILocation.objects.all().order_by('-id')
-    paginator = Paginator(locations, 20)  # 20 locations per page
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
-    
+    locations = KeysetPage(GILocation.objects.all(), request.GET)
     context = {
-        'locations': page_obj,
-        'total_count': locations.count()
+        'locations': locations,
+        'total_count': locations.total_count()
     }
     return render(request, 'admin_panel/gi_locations.html', context)
 
@@ -224,14 +279,10 @@ def delete_gi_location_view(request, location_id):
 @admin_required
 def ad_locations_view(request):
     """Manage Ad Locations"""
-    locations = AdLocation.objects.all().order_by('-id')
-    paginator = Paginator(locations, 20)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
-    
+    locations = KeysetPage(AdLocation.objects.all(), request.GET)
     context = {
-        'locations': page_obj,
-        'total_count': locations.count()
+        'locations': locations,
+        'total_count': locations.total_count()
     }
     return render(request, 'admin_panel/ad_locations.html', context)
 
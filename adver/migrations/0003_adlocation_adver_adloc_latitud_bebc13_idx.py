@@ -0,0 +1,19 @@
+# Generated by Django 5.0.7 on 2026-10-18 05:41
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('adver', '0002_alter_adlocation_created_by'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='adlocation',
+            index=models.Index(fields=['latitude', 'longitude'], name='adver_adloc_latitud_bebc13_idx'),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.0.7 on 2026-10-18 05:50
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('adver', '0004_adlocation_search_vector_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='adlocation',
+            index=models.Index(fields=['district', 'service_type', 'name', 'id'], name='adver_adloc_distric_c113f9_idx'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.0.7 on 2026-10-18 06:37
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('adver', '0005_adlocation_adver_adloc_distric_c113f9_idx'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='adlocation',
+            options={'base_manager_name': 'objects', 'ordering': ['district', 'service_type', 'name'], 'verbose_name': 'Ad Location', 'verbose_name_plural': 'Ad Locations'},
+        ),
+    ]
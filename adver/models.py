@@ -1,5 +1,9 @@
 from django.db import models
 from django.contrib.auth.models import User
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVector, SearchVectorField
+
+from catalog.managers import LocationManager
 
 
 class AdLocation(models.Model):
@@ -31,11 +35,33 @@ class AdLocation(models.Model):
     created_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    # Weighted full-text document maintained by PostgreSQL (see catalog/search.py)
+    search_vector = models.GeneratedField(
+        expression=(
+            SearchVector('name', weight='A', config='english') +
+            SearchVector('district', weight='B', config='english') +
+            SearchVector('service_type', weight='B', config='english') +
+            SearchVector('description', weight='C', config='english')
+        ),
+        output_field=SearchVectorField(),
+        db_persist=True,
+    )
+    
+    objects = LocationManager()
     
     class Meta:
+        # Related-object access (schedule_item.ad_location) skips search_vector too
+        base_manager_name = 'objects'
         ordering = ['district', 'service_type', 'name']
         verbose_name = 'Ad Location'
         verbose_name_plural = 'Ad Locations'
+        indexes = [
+            # Bounding-box prefilter for nearby queries
+            models.Index(fields=['latitude', 'longitude']),
+            # Default ordering plus tie-breaker, for keyset pagination
+            models.Index(fields=['district', 'service_type', 'name', 'id']),
+            GinIndex(fields=['search_vector']),
+        ]
     
     def __str__(self):
         return f"{self.name} ({self.service_type}) - {self.district}"
@@ -1,8 +1,9 @@
 from rest_framework import serializers
+from catalog.serializers import SparseFieldsSerializerMixin
 from .models import AdLocation
 
 
-class AdLocationSerializer(serializers.ModelSerializer):
+class AdLocationSerializer(SparseFieldsSerializerMixin, serializers.ModelSerializer):
     """Serializer for Ad Location model"""
     
     created_by_username = serializers.CharField(source='created_by.username', read_only=True)
@@ -19,6 +20,13 @@ class AdLocationSerializer(serializers.ModelSerializer):
             'created_by_username', 'created_at', 'updated_at'
         ]
         read_only_fields = ['created_by', 'created_at', 'updated_at']
+        field_columns = {
+            'image_url': ['image'],
+            'service_type_display': ['service_type'],
+            'created_by_username': ['created_by__username'],
+        }
+        # With a request in the context, image_url is the absolute image URL
+        fast_aliases = {'image_url': 'image'}
     
     def get_image_url(self, obj):
         request = self.context.get('request')
@@ -35,7 +43,7 @@ class AdLocationSerializer(serializers.ModelSerializer):
         return None
 
 
-class AdLocationListSerializer(serializers.ModelSerializer):
+class AdLocationListSerializer(SparseFieldsSerializerMixin, serializers.ModelSerializer):
     """Lightweight serializer for listing ad locations"""
     
     service_type_display = serializers.CharField(source='get_service_type_display', read_only=True)
@@ -46,6 +54,9 @@ class AdLocationListSerializer(serializers.ModelSerializer):
             'id', 'name', 'district', 'latitude', 'longitude',
             'image', 'service_type', 'service_type_display', 'price_range'
         ]
+        field_columns = {
+            'service_type_display': ['service_type'],
+        }
 
 
 class AdLocationCreateSerializer(serializers.ModelSerializer):
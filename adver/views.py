@@ -2,24 +2,30 @@ from rest_framework import viewsets, filters, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticatedOrReadOnly, IsAuthenticated
+from catalog.grouped import grouped_rows, listing_cache, parse_group_limit
+from catalog.mixins import ConditionalCatalogMixin, FastListMixin, NearbyMixin, SparseFieldsetMixin
+from catalog.search import FullTextSearchFilter
 from .models import AdLocation
 from .serializers import AdLocationSerializer, AdLocationListSerializer
 
 
-class AdLocationViewSet(viewsets.ModelViewSet):
+class AdLocationViewSet(ConditionalCatalogMixin, FastListMixin, SparseFieldsetMixin, NearbyMixin, viewsets.ModelViewSet):
     """
     ViewSet for Ad Location CRUD operations
     """
     queryset = AdLocation.objects.filter(is_active=True)
     serializer_class = AdLocationSerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
-    filter_backends = [filters.SearchFilter, filters.OrderingFilter]
+    filter_backends = [filters.OrderingFilter, FullTextSearchFilter]
+    # Covered by the model's search_vector (name > district, service_type > description)
     search_fields = ['name', 'district', 'description', 'service_type']
     ordering_fields = ['name', 'district', 'service_type', 'created_at']
     ordering = ['district', 'service_type', 'name']
+    # Keyset pages (?cursor=) follow the default ordering, backed by a composite index
+    cursor_ordering = ['district', 'service_type', 'name', 'id']
     
     def get_serializer_class(self):
-        if self.action == 'list':
+        if self.action in ['list', 'nearby']:
             return AdLocationListSerializer
         return AdLocationSerializer
     
@@ -51,7 +57,7 @@ class AdLocationViewSet(viewsets.ModelViewSet):
             type_list = service_types.split(',')
             queryset = queryset.filter(service_type__in=type_list)
         
-        return queryset
+        return self.prune_columns(queryset)
     
     @action(detail=False, methods=['get'])
     def service_types(self, request):
@@ -68,18 +74,26 @@ class AdLocationViewSet(viewsets.ModelViewSet):
     def by_service_type(self, request):
         """
         Get ad locations grouped by service type
+        ?limit=N returns at most N locations (first by district, name) per service type
         """
-        result = {}
+        try:
+            limit = parse_group_limit(request.query_params.get('limit'))
+        except ValueError:
+            return Response({'error': 'limit must be a positive integer'}, status=status.HTTP_400_BAD_REQUEST)
         
-        for service_type, label in AdLocation.SERVICE_TYPE_CHOICES:
-            locations = AdLocation.objects.filter(service_type=service_type, is_active=True)
-            serializer = AdLocationListSerializer(locations, many=True)
-            result[service_type] = {
-                'label': label,
-                'locations': serializer.data
+        def build():
+            result = {
+                service_type: {'label': label, 'locations': []}
+                for service_type, label in AdLocation.SERVICE_TYPE_CHOICES
             }
+            fields = [name for name in AdLocationListSerializer.Meta.fields if name != 'service_type_display']
+            locations = AdLocation.objects.filter(is_active=True).only(*fields)
+            for service_type, rows in grouped_rows(locations, 'service_type', ['district', 'name'], limit):
+                if service_type in result:
+                    result[service_type]['locations'] = AdLocationListSerializer(rows, many=True).data
+            return result
         
-        return Response(result)
+        return Response(listing_cache.get_or_build(('ad_by_service_type', limit), build))
     
     @action(detail=False, methods=['get'])
     def my_locations(self, request):
@@ -14,6 +14,9 @@ python manage.py makemigrations
 echo "🔄 Running migrations..."
 python manage.py migrate --verbosity=2
 
+echo "🗺️ Rebuilding map clusters..."
+python manage.py rebuild_map_clusters
+
 echo "📦 Collecting static files..."
 python manage.py collectstatic --no-input
 
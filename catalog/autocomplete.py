@@ -0,0 +1,161 @@
+"""
+Autocomplete Index
+Process-local suggestion index over GI / ad location names and districts, so the
+search box never hits the database per keystroke. Words are kept in a sorted
+array (a flattened prefix trie: every prefix is one contiguous range, found by
+bisection) with the best entries for 1-2 letter prefixes precomputed; a trigram
+index catches typos when prefixes find too little. Rebuilt when the catalog
+version moves (see versioning.py).
+"""
+import heapq
+import re
+import threading
+from bisect import bisect_left
+from collections import Counter, defaultdict
+from typing import Dict, List, Optional, Tuple
+
+from home.models import GILocation
+from adver.models import AdLocation
+from .versioning import current_catalog_version
+
+
+MAX_SUGGESTIONS = 10
+PRECOMPUTED_PREFIX_LENGTH = 2
+MIN_TRIGRAM_SIMILARITY = 0.3
+WORD_RE = re.compile(r'\w+')
+
+ENTRY_GI = 'gi'
+ENTRY_AD = 'ad'
+ENTRY_DISTRICT = 'district'
+
+
+def normalize_words(text: str) -> List[str]:
+    return WORD_RE.findall(text.casefold())
+
+
+def trigrams(word: str) -> set:
+    """pg_trgm-style trigrams of a word padded with two leading spaces and one trailing"""
+    padded = f'  {word} '
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class AutocompleteIndex:
+    """
+    Suggestions for one catalog version
+    Entries are (type, id, name); districts are entries of their own with id None.
+    """
+
+    def __init__(self, version: int, entries: List[Tuple[str, Optional[int], str]]):
+        self.version = version
+        self.entries = entries
+        # Shorter names first, then alphabetical: the order suggestions are shown in
+        self._rank = [(len(name), name.casefold(), i) for i, (_, _, name) in enumerate(entries)]
+        self._entry_words = [set(normalize_words(name)) for _, _, name in entries]
+
+        pairs = sorted({(word, i) for i, words in enumerate(self._entry_words) for word in words})
+        self._words = [word for word, _ in pairs]
+        self._word_entries = [i for _, i in pairs]
+
+        self._top = defaultdict(set)
+        for word, i in pairs:
+            for length in range(1, min(len(word), PRECOMPUTED_PREFIX_LENGTH) + 1):
+                self._top[word[:length]].add(i)
+        self._top = {
+            prefix: [rank[2] for rank in heapq.nsmallest(MAX_SUGGESTIONS, (self._rank[i] for i in found))]
+            for prefix, found in self._top.items()
+        }
+
+        self._trigrams = defaultdict(list)
+        self._vocabulary = sorted(set(self._words))
+        self._trigram_counts = []
+        for w, word in enumerate(self._vocabulary):
+            grams = trigrams(word)
+            self._trigram_counts.append(len(grams))
+            for gram in grams:
+                self._trigrams[gram].append(w)
+
+    def _matching(self, words: List[str]):
+        """Entries having, for every word, a word that starts with it"""
+        words = sorted(words, key=len, reverse=True)
+        # Narrow by the longest (most selective) word, then check the others per entry
+        lo = bisect_left(self._words, words[0])
+        hi = bisect_left(self._words, words[0] + '\U0010ffff', lo)
+        rest = words[1:]
+        for i in set(self._word_entries[lo:hi]):
+            if all(any(w.startswith(word) for w in self._entry_words[i]) for word in rest):
+                yield i
+
+    def _similar_words(self, word: str) -> List[str]:
+        """Vocabulary words by descending trigram (Jaccard) similarity to `word`"""
+        grams = trigrams(word)
+        shared = Counter(w for gram in grams for w in self._trigrams.get(gram, ()))
+        similar = []
+        for w, count in shared.items():
+            similarity = count / (len(grams) + self._trigram_counts[w] - count)
+            if similarity >= MIN_TRIGRAM_SIMILARITY:
+                similar.append((-similarity, self._vocabulary[w]))
+        return [word for _, word in sorted(similar)]
+
+    def suggest(self, query: str, limit: int = MAX_SUGGESTIONS) -> List[Dict]:
+        """
+        Up to `limit` entries with a word starting with each word of `query`, shortest
+        names first; typo matches for the last (usually half-typed) word fill up the rest
+        """
+        words = normalize_words(query)
+        if not words or limit <= 0:
+            return []
+
+        if len(words) == 1 and len(words[0]) <= PRECOMPUTED_PREFIX_LENGTH and limit <= MAX_SUGGESTIONS:
+            found = self._top.get(words[0], [])[:limit]
+        else:
+            found = [rank[2] for rank in heapq.nsmallest(limit, (self._rank[i] for i in self._matching(words)))]
+
+        if len(found) < limit and len(words[-1]) >= 3:
+            seen = set(found)
+            for similar in self._similar_words(words[-1]):
+                extra = sorted(
+                    (i for i in self._matching(words[:-1] + [similar]) if i not in seen),
+                    key=self._rank.__getitem__
+                )
+                seen.update(extra)
+                found.extend(extra)
+                if len(found) >= limit:
+                    break
+            found = found[:limit]
+
+        return [
+            {'type': entry_type, 'id': pk, 'name': name}
+            for entry_type, pk, name in (self.entries[i] for i in found)
+        ]
+
+
+def load_autocomplete_index(version: int) -> AutocompleteIndex:
+    entries = []
+    districts = set()
+    for pk, name, district in GILocation.objects.order_by('id').values_list('id', 'name', 'district'):
+        entries.append((ENTRY_GI, pk, name))
+        districts.add(district)
+    for pk, name, district in (
+        AdLocation.objects.filter(is_active=True).order_by('id').values_list('id', 'name', 'district')
+    ):
+        entries.append((ENTRY_AD, pk, name))
+        districts.add(district)
+    entries.extend((ENTRY_DISTRICT, None, district) for district in sorted(districts) if district)
+    return AutocompleteIndex(version, entries)
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_autocomplete_index() -> AutocompleteIndex:
+    """The process-wide index, (re)built if the catalog changed since it was loaded"""
+    global _index
+    version = current_catalog_version()
+    index = _index
+    if index is None or index.version != version:
+        with _index_lock:
+            if _index is None or _index.version != version:
+                _index = load_autocomplete_index(version)
+            index = _index
+    return index
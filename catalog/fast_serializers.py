@@ -0,0 +1,187 @@
+"""
+Fast Read Serializers
+Renders list pages straight from queryset.values() rows instead of building a
+ModelSerializer representation per object. Converters are derived once per
+request from the DRF serializer's own fields (decimal places, time / datetime
+formats, choice labels, file URLs), so the JSON is byte-identical; the absolute
+media base URL is resolved once per request rather than once per row.
+Fields the fast path does not understand make it unavailable, and callers fall
+back to the regular serializer.
+"""
+import decimal
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from django.core.files.storage import FileSystemStorage
+from django.utils.encoding import filepath_to_uri
+from rest_framework import ISO_8601, fields as drf_fields, relations
+from rest_framework.fields import empty
+from rest_framework.settings import api_settings
+
+
+class FastPathUnavailable(Exception):
+    pass
+
+
+_SKIP = object()
+
+
+def _identity(value):
+    return value
+
+
+def _decimal_converter(field) -> Callable:
+    """DecimalField.to_representation with its quantize context built once"""
+    coerce_to_string = getattr(field, 'coerce_to_string', api_settings.COERCE_DECIMAL_TO_STRING)
+    if field.localize:
+        raise FastPathUnavailable('localized decimals')
+    if field.decimal_places is None:
+        quantize = _identity
+    else:
+        exponent = decimal.Decimal('.1') ** field.decimal_places
+        context = decimal.getcontext().copy()
+        if field.max_digits is not None:
+            context.prec = field.max_digits
+
+        def quantize(value):
+            return value.quantize(exponent, rounding=field.rounding, context=context)
+
+    def convert(value):
+        if not isinstance(value, decimal.Decimal):
+            value = decimal.Decimal(str(value).strip())
+        quantized = quantize(value)
+        return '{:f}'.format(quantized) if coerce_to_string else quantized
+    return convert
+
+
+def _time_converter(field) -> Callable:
+    output_format = getattr(field, 'format', api_settings.TIME_FORMAT)
+    if output_format is None:
+        return _identity
+    if output_format.lower() != ISO_8601:
+        return lambda value: value.strftime(output_format)
+    return lambda value: value.isoformat()
+
+
+def _datetime_converter(field) -> Callable:
+    output_format = getattr(field, 'format', api_settings.DATETIME_FORMAT)
+    if output_format is None or output_format.lower() != ISO_8601:
+        raise FastPathUnavailable('non-ISO datetime format')
+
+    field_timezone = field.timezone if hasattr(field, 'timezone') else field.default_timezone()
+
+    def convert(value):
+        if field_timezone is not None and value.tzinfo is not None:
+            value = value.astimezone(field_timezone)
+        else:
+            value = field.enforce_timezone(value)
+        value = value.isoformat()
+        if value.endswith('+00:00'):
+            value = value[:-6] + 'Z'
+        return value
+    return convert
+
+
+def _file_converter(field, model_field, request) -> Callable:
+    """FileField.to_representation; a file system storage URL is a prefix plus the quoted name"""
+    if not getattr(field, 'use_url', api_settings.UPLOADED_FILES_USE_URL):
+        return lambda name: name or None
+    storage = model_field.storage
+    if request is None:
+        return lambda name: storage.url(name) if name else None
+    # default_storage is a lazy proxy; check the class it stands for
+    if not isinstance(storage, FileSystemStorage) or storage.__class__.url is not FileSystemStorage.url:
+        return lambda name: request.build_absolute_uri(storage.url(name)) if name else None
+    base_url = request.build_absolute_uri(storage.base_url)
+    return lambda name: base_url + filepath_to_uri(name).lstrip('/') if name else None
+
+
+def _choice_label_converter(model_field) -> Callable:
+    labels = {value: str(label) for value, label in model_field.flatchoices}
+    return lambda value: labels.get(value, value)
+
+
+class FastRowSerializer:
+    """
+    Renders values() rows like `serializer_class(many=True, context=context).data`
+    Serializers map computed fields to their columns with Meta.field_columns and may
+    declare Meta.fast_aliases = {'image_url': 'image'} for method fields that render
+    exactly like another field when a request is present.
+    """
+
+    def __init__(self, serializer_class, context: Dict[str, Any]):
+        serializer = serializer_class(context=context)
+        # Aliased fields may themselves be left out of a sparse fieldset
+        all_fields = serializer_class(context={**context, 'fields': None}).fields
+        meta = serializer_class.Meta
+        model = meta.model
+        field_columns = getattr(meta, 'field_columns', {})
+        aliases = getattr(meta, 'fast_aliases', {})
+        request = context.get('request')
+
+        self.columns: List[str] = []
+        self.converters: List[Tuple[str, str, Optional[str], Callable, Any]] = []
+        for name, field in serializer.fields.items():
+            if field.write_only:
+                continue
+            if name in aliases:
+                field = all_fields[aliases[name]]
+            columns = field_columns.get(name, [field.source.replace('.', '__')])
+            if len(columns) != 1:
+                raise FastPathUnavailable(f'{name} reads several columns')
+            column = columns[0]
+            relation = column.split('__', 1)[0] if '__' in column else None
+            convert = self._converter(field, model, column, request)
+            missing = self._missing_value(field) if relation else None
+            self.converters.append((name, column, relation, convert, missing))
+            for needed in filter(None, (relation, column)):
+                if needed not in self.columns:
+                    self.columns.append(needed)
+
+    @staticmethod
+    def _converter(field, model, column, request) -> Callable:
+        source = field.source
+        if source.startswith('get_') and source.endswith('_display'):
+            return _choice_label_converter(model._meta.get_field(source[4:-8]))
+        if isinstance(field, drf_fields.DecimalField):
+            return _decimal_converter(field)
+        if isinstance(field, drf_fields.DateTimeField):
+            return _datetime_converter(field)
+        if isinstance(field, drf_fields.TimeField):
+            return _time_converter(field)
+        if isinstance(field, drf_fields.FileField):
+            return _file_converter(field, model._meta.get_field(column), request)
+        if isinstance(field, relations.PrimaryKeyRelatedField) and field.pk_field is None:
+            return _identity
+        if isinstance(field, drf_fields.ChoiceField):
+            return lambda value: field.choice_strings_to_values.get(str(value), value) if value != '' else value
+        if isinstance(field, drf_fields.CharField):
+            return str
+        if isinstance(field, (drf_fields.IntegerField, drf_fields.BooleanField)):
+            return _identity
+        raise FastPathUnavailable(f'{type(field).__name__} {field.field_name}')
+
+    @staticmethod
+    def _missing_value(field):
+        """What the serializer renders when a related object is missing (Field.get_attribute)"""
+        if field.default is not empty:
+            raise FastPathUnavailable(f'{field.field_name} has a default')
+        if field.allow_null:
+            return None
+        if not field.required:
+            return _SKIP
+        raise FastPathUnavailable(f'{field.field_name} is required')
+
+    def row(self, values: Dict[str, Any]) -> Dict[str, Any]:
+        data = {}
+        for name, column, relation, convert, missing in self.converters:
+            if relation is not None and values[relation] is None:
+                if missing is not _SKIP:
+                    data[name] = missing
+                continue
+            value = values[column]
+            data[name] = None if value is None else convert(value)
+        return data
+
+    def rows(self, rows) -> List[Dict[str, Any]]:
+        row = self.row
+        return [row(values) for values in rows]
@@ -0,0 +1,84 @@
+"""
+Geo Helpers
+Radius search over location tables: a bounding box on the indexed latitude /
+longitude columns narrows the rows, then exact haversine distances rank them.
+The nearby endpoint normally ranks with the in-memory KD-tree instead (see
+spatial_index.py) and only asks the database which candidates pass its filters.
+"""
+from math import cos, radians
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+
+EARTH_RADIUS_KM = 6371.0
+KM_PER_DEGREE_LAT = 111.195
+# Above this many candidates one bounding-box query for ids beats a long IN list
+MAX_CANDIDATE_LOOKUP = 500
+
+
+def bounding_box(lat: float, lng: float, radius_km: float) -> Tuple[float, float, Optional[float], Optional[float]]:
+    """
+    (min_lat, max_lat, min_lng, max_lng) enclosing the circle around (lat, lng)
+    The longitude bounds are None when the box reaches a pole or crosses the antimeridian.
+    """
+    delta_lat = radius_km / KM_PER_DEGREE_LAT
+    min_lat, max_lat = lat - delta_lat, lat + delta_lat
+    if min_lat <= -90 or max_lat >= 90:
+        return max(min_lat, -90.0), min(max_lat, 90.0), None, None
+
+    delta_lng = delta_lat / cos(radians(lat))
+    if lng - delta_lng < -180 or lng + delta_lng > 180:
+        return min_lat, max_lat, None, None
+    return min_lat, max_lat, lng - delta_lng, lng + delta_lng
+
+
+def haversine_km(lat: float, lng: float, lats: np.ndarray, lngs: np.ndarray) -> np.ndarray:
+    """Great-circle distance in km from (lat, lng) to every (lats[i], lngs[i])"""
+    lat1, lng1 = np.radians(lat), np.radians(lng)
+    lat2, lng2 = np.radians(lats), np.radians(lngs)
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lng2 - lng1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+def _in_bounding_box(queryset, lat: float, lng: float, radius_km: float):
+    min_lat, max_lat, min_lng, max_lng = bounding_box(lat, lng, radius_km)
+    queryset = queryset.filter(latitude__gte=min_lat, latitude__lte=max_lat)
+    if min_lng is not None:
+        queryset = queryset.filter(longitude__gte=min_lng, longitude__lte=max_lng)
+    return queryset
+
+
+def rank_by_distance(queryset, lat: float, lng: float, radius_km: float) -> List[Tuple[int, float]]:
+    """(id, distance_km) of every row within `radius_km`, nearest first (ties by id)"""
+    queryset = _in_bounding_box(queryset, lat, lng, radius_km)
+    rows = list(queryset.order_by().values_list('id', 'latitude', 'longitude'))
+    if not rows:
+        return []
+
+    ids = np.array([row[0] for row in rows])
+    distances = haversine_km(
+        lat, lng,
+        np.array([float(row[1]) for row in rows]),
+        np.array([float(row[2]) for row in rows])
+    )
+    inside = distances <= radius_km
+    ids, distances = ids[inside], distances[inside]
+    order = np.lexsort((ids, distances))
+    return [(int(ids[i]), round(float(distances[i]), 3)) for i in order]
+
+
+def filter_ranked(queryset, ranked: List[Tuple[int, float]], lat: float, lng: float,
+                  radius_km: float) -> List[Tuple[int, float]]:
+    """
+    The (id, distance_km) pairs of rank_by_distance-style `ranked` candidates
+    around (lat, lng) whose rows are in `queryset`, in their original order
+    """
+    if not ranked:
+        return []
+    if len(ranked) <= MAX_CANDIDATE_LOOKUP:
+        queryset = queryset.filter(id__in=[pk for pk, _ in ranked])
+    else:
+        queryset = _in_bounding_box(queryset, lat, lng, radius_km)
+    allowed = set(queryset.order_by().values_list('id', flat=True))
+    return [(pk, distance) for pk, distance in ranked if pk in allowed]
@@ -0,0 +1,80 @@
+"""
+Grouped Listings
+Landing-page listings (GI locations by district, ads by service type) are read with
+one ordered query and split into groups in Python, instead of one query per group.
+An optional per-group limit is applied in the database with a ROW_NUMBER() window.
+Built listings are cached per process until the catalog version moves.
+"""
+import threading
+from itertools import groupby
+from operator import attrgetter
+from typing import Any, Callable, Dict, Hashable, Iterator, List, Optional, Tuple
+
+from django.db.models import F, QuerySet, Window
+from django.db.models.functions import RowNumber
+
+from .versioning import current_catalog_version
+
+
+# Distinct (listing, limit) keys cached per catalog version; others are built uncached
+MAX_CACHED_LISTINGS = 64
+
+
+def grouped_rows(queryset: QuerySet, group_field: str, order_by: List[str],
+                 limit: Optional[int] = None) -> Iterator[Tuple[Any, List]]:
+    """
+    (group value, rows) pairs from a single query ordered by `group_field`, then
+    `order_by`; with `limit`, at most that many rows per group are fetched
+    """
+    if limit is not None:
+        queryset = queryset.annotate(
+            group_rank=Window(RowNumber(), partition_by=F(group_field), order_by=order_by)
+        ).filter(group_rank__lte=limit)
+    rows = queryset.order_by(group_field, *order_by, 'id')
+    for group, members in groupby(rows, key=attrgetter(group_field)):
+        yield group, list(members)
+
+
+class VersionedListingCache:
+    """Built listings of the current catalog version; emptied when the version moves"""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._version = None
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get_or_build(self, key: Hashable, build: Callable[[], Dict]) -> Dict:
+        version = current_catalog_version()
+        with self._lock:
+            if self._version != version:
+                self._version = version
+                self._entries = {}
+            listing = self._entries.get(key)
+        if listing is not None:
+            return listing
+
+        listing = build()
+        with self._lock:
+            # A slower build of an older version must not be cached under the new one
+            if self._version == version and len(self._entries) < self.max_entries:
+                self._entries[key] = listing
+        return listing
+
+    def clear(self) -> None:
+        with self._lock:
+            self._version = None
+            self._entries = {}
+
+
+listing_cache = VersionedListingCache(MAX_CACHED_LISTINGS)
+
+
+def parse_group_limit(value: Optional[str]) -> Optional[int]:
+    """The optional ?limit= per group; raises ValueError unless it is a positive integer"""
+    if value in (None, ''):
+        return None
+    limit = int(value)
+    if limit < 1:
+        raise ValueError('limit must be at least 1')
+    return limit
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from catalog.map_clusters import rebuild_map_clusters
+
+
+class Command(BaseCommand):
+    help = 'Recompute the per-zoom map marker clusters from all locations'
+
+    def handle(self, *args, **options):
+        count = rebuild_map_clusters()
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt {count} map cluster(s)'))
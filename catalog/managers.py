@@ -0,0 +1,13 @@
+"""
+Location Managers
+The `search_vector` tsvector is only ever matched in SQL (see search.py) and is
+larger than the rest of a row, so location querysets leave it out unless asked for.
+"""
+from django.db import models
+
+
+class LocationManager(models.Manager):
+    """Default and base manager of GILocation / AdLocation: defers `search_vector`"""
+
+    def get_queryset(self):
+        return super().get_queryset().defer('search_vector')
@@ -0,0 +1,222 @@
+"""
+Map Marker Clusters
+Web-Mercator grid clusters of GI / ad locations for every zoom level, stored in
+MapCluster and updated per location on save / delete, so a map viewport costs one
+indexed range query whose size depends on the viewport, not on the catalog.
+Each map tile is split into CELLS_PER_TILE x CELLS_PER_TILE cells (64 px for 256 px
+tiles); a cell keeps its marker count, coordinate sums (for the centroid) and up
+to MAX_REPRESENTATIVES location ids.
+"""
+from math import atan, cos, degrees, floor, log, pi, radians, sinh, tan
+from typing import Dict, List, Optional, Tuple
+
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+
+from home.models import GILocation
+from adver.models import AdLocation
+from .models import MapCluster
+
+
+MIN_ZOOM = 0
+MAX_ZOOM = 16
+CELLS_PER_TILE = 4
+MAX_REPRESENTATIVES = 5
+# Viewports spanning more cells are answered from a coarser zoom
+MAX_VIEWPORT_CELLS = 4096
+MAX_MERCATOR_LATITUDE = 85.05112878
+
+LOCATION_TYPES = {
+    GILocation: 'gi',
+    AdLocation: 'ad',
+}
+
+
+def clustered_locations(location_type: str):
+    """Queryset of the locations shown on the map for a type"""
+    if location_type == 'ad':
+        return AdLocation.objects.filter(is_active=True)
+    return GILocation.objects.all()
+
+
+def grid_size(zoom: int) -> int:
+    return (1 << zoom) * CELLS_PER_TILE
+
+
+def cell_for(lat: float, lng: float, zoom: int) -> Tuple[int, int]:
+    """Grid cell containing a point; y grows southwards like map tiles"""
+    size = grid_size(zoom)
+    lat = max(-MAX_MERCATOR_LATITUDE, min(MAX_MERCATOR_LATITUDE, lat))
+    x = (lng + 180.0) / 360.0
+    y = (1.0 - log(tan(radians(lat)) + 1.0 / cos(radians(lat))) / pi) / 2.0
+    return min(size - 1, max(0, floor(x * size))), min(size - 1, max(0, floor(y * size)))
+
+
+def cell_bounds(zoom: int, x: int, y: int) -> Tuple[float, float, float, float]:
+    """(south, north, west, east) of a grid cell; edge rows extend to the poles"""
+    size = grid_size(zoom)
+    north = 90.0 if y == 0 else degrees(atan(sinh(pi * (1 - 2 * y / size))))
+    south = -90.0 if y == size - 1 else degrees(atan(sinh(pi * (1 - 2 * (y + 1) / size))))
+    return south, north, x / size * 360.0 - 180.0, (x + 1) / size * 360.0 - 180.0
+
+
+def _cells(lat: float, lng: float) -> List[Tuple[int, int, int]]:
+    return [(zoom, *cell_for(lat, lng, zoom)) for zoom in range(MIN_ZOOM, MAX_ZOOM + 1)]
+
+
+def _cell_filter(cells: List[Tuple[int, int, int]]) -> Q:
+    condition = Q()
+    for zoom, x, y in cells:
+        condition |= Q(zoom=zoom, cell_x=x, cell_y=y)
+    return condition
+
+
+def _refill_representatives(cluster: MapCluster, location_type: str) -> None:
+    """Top up a cluster's representative ids from the locations in its cell"""
+    missing = min(cluster.count, MAX_REPRESENTATIVES) - len(cluster.representative_ids)
+    if missing <= 0:
+        return
+    south, north, west, east = cell_bounds(cluster.zoom, cluster.cell_x, cluster.cell_y)
+    candidates = (
+        clustered_locations(location_type)
+        .filter(latitude__gte=south, latitude__lte=north, longitude__gte=west, longitude__lte=east)
+        .exclude(id__in=cluster.representative_ids)
+        .order_by('id')
+        .values_list('id', 'latitude', 'longitude')
+    )
+    for pk, lat, lng in candidates:
+        # Bounds are inclusive on both sides; keep only points that really map to this cell
+        if cell_for(float(lat), float(lng), cluster.zoom) == (cluster.cell_x, cluster.cell_y):
+            cluster.representative_ids.append(pk)
+            missing -= 1
+            if missing == 0:
+                return
+
+
+def _apply(location_type: str, pk: int, lat: float, lng: float, delta: int) -> None:
+    cells = _cells(lat, lng)
+    with transaction.atomic():
+        existing = {
+            (cluster.zoom, cluster.cell_x, cluster.cell_y): cluster
+            for cluster in MapCluster.objects.select_for_update().filter(
+                _cell_filter(cells), location_type=location_type
+            )
+        }
+        to_create, to_update, to_delete = [], [], []
+        for zoom, x, y in cells:
+            cluster = existing.get((zoom, x, y))
+            if delta > 0:
+                if cluster is None:
+                    to_create.append(MapCluster(
+                        location_type=location_type, zoom=zoom, cell_x=x, cell_y=y,
+                        count=1, latitude_sum=lat, longitude_sum=lng, representative_ids=[pk]
+                    ))
+                    continue
+                cluster.count += 1
+                cluster.latitude_sum += lat
+                cluster.longitude_sum += lng
+                if len(cluster.representative_ids) < MAX_REPRESENTATIVES and pk not in cluster.representative_ids:
+                    cluster.representative_ids.append(pk)
+                to_update.append(cluster)
+            elif cluster is not None:
+                if cluster.count <= 1:
+                    to_delete.append(cluster.pk)
+                    continue
+                cluster.count -= 1
+                cluster.latitude_sum -= lat
+                cluster.longitude_sum -= lng
+                if pk in cluster.representative_ids:
+                    cluster.representative_ids.remove(pk)
+                    _refill_representatives(cluster, location_type)
+                to_update.append(cluster)
+
+        if to_delete:
+            MapCluster.objects.filter(pk__in=to_delete).delete()
+        if to_update:
+            MapCluster.objects.bulk_update(
+                to_update, ['count', 'latitude_sum', 'longitude_sum', 'representative_ids']
+            )
+        if to_create:
+            MapCluster.objects.bulk_create(to_create)
+
+
+def _apply_with_retry(location_type: str, pk: int, lat: float, lng: float, delta: int) -> None:
+    try:
+        _apply(location_type, pk, lat, lng, delta)
+    except IntegrityError:
+        # Another writer created one of the cells first; it is visible (and locked) now
+        _apply(location_type, pk, lat, lng, delta)
+
+
+def add_location(location_type: str, pk: int, lat: float, lng: float) -> None:
+    _apply_with_retry(location_type, pk, lat, lng, 1)
+
+
+def remove_location(location_type: str, pk: int, lat: float, lng: float) -> None:
+    _apply_with_retry(location_type, pk, lat, lng, -1)
+
+
+def rebuild_map_clusters() -> int:
+    """Recompute every cluster from scratch; returns the number of cluster rows"""
+    clusters: Dict[Tuple[str, int, int, int], MapCluster] = {}
+    for location_type in LOCATION_TYPES.values():
+        rows = clustered_locations(location_type).order_by('id').values_list('id', 'latitude', 'longitude')
+        for pk, lat, lng in rows.iterator():
+            lat, lng = float(lat), float(lng)
+            for zoom, x, y in _cells(lat, lng):
+                key = (location_type, zoom, x, y)
+                cluster = clusters.get(key)
+                if cluster is None:
+                    cluster = clusters[key] = MapCluster(
+                        location_type=location_type, zoom=zoom, cell_x=x, cell_y=y,
+                        latitude_sum=0.0, longitude_sum=0.0, representative_ids=[]
+                    )
+                cluster.count += 1
+                cluster.latitude_sum += lat
+                cluster.longitude_sum += lng
+                if len(cluster.representative_ids) < MAX_REPRESENTATIVES:
+                    cluster.representative_ids.append(pk)
+
+    with transaction.atomic():
+        MapCluster.objects.all().delete()
+        MapCluster.objects.bulk_create(clusters.values(), batch_size=1000)
+    return len(clusters)
+
+
+def clusters_in_bbox(min_lng: float, min_lat: float, max_lng: float, max_lat: float, zoom: int,
+                     location_type: Optional[str] = None) -> Tuple[int, List[Dict]]:
+    """
+    (zoom used, clusters) for a viewport; min_lng > max_lng means it crosses the antimeridian
+    The zoom is lowered until the viewport spans at most MAX_VIEWPORT_CELLS cells.
+    """
+    zoom = max(MIN_ZOOM, min(zoom, MAX_ZOOM))
+    while True:
+        x_min, y_min = cell_for(max_lat, min_lng, zoom)
+        x_max, y_max = cell_for(min_lat, max_lng, zoom)
+        if x_min <= x_max:
+            x_ranges = [(x_min, x_max)]
+        else:
+            x_ranges = [(x_min, grid_size(zoom) - 1), (0, x_max)]
+        cells = sum(hi - lo + 1 for lo, hi in x_ranges) * (y_max - y_min + 1)
+        if cells <= MAX_VIEWPORT_CELLS or zoom == MIN_ZOOM:
+            break
+        zoom -= 1
+
+    in_x = Q()
+    for lo, hi in x_ranges:
+        in_x |= Q(cell_x__gte=lo, cell_x__lte=hi)
+    queryset = MapCluster.objects.filter(in_x, zoom=zoom, cell_y__gte=y_min, cell_y__lte=y_max)
+    if location_type:
+        queryset = queryset.filter(location_type=location_type)
+
+    clusters = [
+        {
+            'type': cluster.location_type,
+            'count': cluster.count,
+            'latitude': round(cluster.latitude_sum / cluster.count, 6),
+            'longitude': round(cluster.longitude_sum / cluster.count, 6),
+            'ids': cluster.representative_ids,
+        }
+        for cluster in queryset.order_by('location_type', 'cell_y', 'cell_x')
+    ]
+    return zoom, clusters
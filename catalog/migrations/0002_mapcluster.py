@@ -0,0 +1,35 @@
+# Generated by Django 5.0.7 on 2026-10-18 05:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MapCluster',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('location_type', models.CharField(max_length=10)),
+                ('zoom', models.PositiveSmallIntegerField()),
+                ('cell_x', models.IntegerField()),
+                ('cell_y', models.IntegerField()),
+                ('count', models.IntegerField(default=0)),
+                ('latitude_sum', models.FloatField(default=0)),
+                ('longitude_sum', models.FloatField(default=0)),
+                ('representative_ids', models.JSONField(default=list)),
+            ],
+            options={
+                'verbose_name': 'Map Cluster',
+                'verbose_name_plural': 'Map Clusters',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='mapcluster',
+            constraint=models.UniqueConstraint(fields=('zoom', 'location_type', 'cell_x', 'cell_y'), name='unique_map_cluster_cell'),
+        ),
+    ]
@@ -0,0 +1,193 @@
+from django.conf import settings
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+from rest_framework import status
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+
+from .fast_serializers import FastPathUnavailable, FastRowSerializer
+from .geo import filter_ranked, rank_by_distance
+from .spatial_index import locations_within
+from .versioning import current_catalog_state
+
+
+DEFAULT_NEARBY_RADIUS_KM = 10
+MAX_NEARBY_RADIUS_KM = 200
+
+
+class NearbyMixin:
+    """
+    Adds GET <list>/nearby/?lat=&lng=&radius_km= to a location ViewSet
+    Results honour the ViewSet's get_queryset() filters, are ordered by distance
+    and paginated like the list endpoint, each with a 'distance_km' field.
+    With CATALOG_SPATIAL_INDEX on, candidates come from the process's KD-tree and
+    the database only checks which of them pass the filters.
+    """
+    
+    @action(detail=False, methods=['get'])
+    def nearby(self, request):
+        """Locations within radius_km (default 10, max 200) of lat/lng, nearest first"""
+        try:
+            lat = float(request.query_params['lat'])
+            lng = float(request.query_params['lng'])
+            radius_km = float(request.query_params.get('radius_km', DEFAULT_NEARBY_RADIUS_KM))
+        except (KeyError, ValueError):
+            return Response(
+                {'error': 'lat and lng are required and, like radius_km, must be numbers'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if not (-90 <= lat <= 90 and -180 <= lng <= 180) or not 0 < radius_km:
+            return Response(
+                {'error': 'lat must be within -90..90, lng within -180..180 and radius_km positive'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        radius_km = min(radius_km, MAX_NEARBY_RADIUS_KM)
+        
+        queryset = self.get_queryset()
+        ranked = None
+        if getattr(settings, 'CATALOG_SPATIAL_INDEX', False):
+            ranked = locations_within(queryset.model, lat, lng, radius_km)
+        if ranked is None:
+            ranked = rank_by_distance(queryset, lat, lng, radius_km)
+        else:
+            ranked = filter_ranked(queryset, ranked, lat, lng, radius_km)
+        page = self.paginate_queryset(ranked)
+        rows = ranked if page is None else page
+        
+        # Only the requested page is loaded in full
+        objects = queryset.in_bulk([pk for pk, _ in rows])
+        data = []
+        for pk, distance in rows:
+            if pk in objects:
+                item = self.get_serializer(objects[pk]).data
+                item['distance_km'] = distance
+                data.append(item)
+        
+        if page is not None:
+            return self.get_paginated_response(data)
+        return Response(data)
+
+
+def _cursor_columns(view):
+    """Keyset pagination reads the sort key of a page's first and last rows"""
+    cursor_param = getattr(view.paginator, 'cursor_query_param', None)
+    if cursor_param in view.request.query_params:
+        return [name.lstrip('-') for name in getattr(view, 'cursor_ordering', [])]
+    return []
+
+
+class SparseFieldsetMixin:
+    """
+    Adds ?fields=id,name,latitude,longitude to a location ViewSet's read actions
+    Only the requested serializer fields are rendered, and the ViewSet's
+    get_queryset() passes its queryset through prune_columns() so only the columns
+    and joins those fields read are fetched. Serializers need SparseFieldsSerializerMixin.
+    """
+    fields_query_param = 'fields'
+    sparse_actions = ('list', 'retrieve', 'nearby')
+    
+    def requested_fields(self):
+        """Requested field names, or None for all fields / actions without sparse fieldsets"""
+        if self.action not in self.sparse_actions:
+            return None
+        value = self.request.query_params.get(self.fields_query_param, '')
+        names = [name.strip() for name in value.split(',') if name.strip()]
+        if not names:
+            return None
+        available = self.get_serializer_class().Meta.fields
+        unknown = [name for name in names if name not in available]
+        if unknown:
+            raise ValidationError({
+                self.fields_query_param: f"Unknown field(s) {', '.join(unknown)}; available: {', '.join(available)}"
+            })
+        return names
+    
+    def prune_columns(self, queryset):
+        """Load only what the rendered fields (and keyset pagination) read"""
+        if self.action not in self.sparse_actions:
+            return queryset
+        serializer_class = self.get_serializer_class()
+        fields = self.requested_fields() or serializer_class.Meta.fields
+        columns, related = serializer_class.columns_for(fields)
+        columns += _cursor_columns(self)
+        if related:
+            queryset = queryset.select_related(*related)
+        return queryset.only(*columns)
+    
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context['fields'] = self.requested_fields()
+        return context
+
+
+class FastListMixin:
+    """
+    Renders list pages from queryset.values() rows with FastRowSerializer instead of
+    a ModelSerializer per object, when CATALOG_FAST_SERIALIZERS is on and the
+    serializer's fields are all supported; the response is identical either way.
+    """
+    
+    def list(self, request, *args, **kwargs):
+        if not getattr(settings, 'CATALOG_FAST_SERIALIZERS', False):
+            return super().list(request, *args, **kwargs)
+        try:
+            fast = FastRowSerializer(self.get_serializer_class(), self.get_serializer_context())
+        except FastPathUnavailable:
+            return super().list(request, *args, **kwargs)
+        
+        columns = fast.columns + [name for name in _cursor_columns(self) if name not in fast.columns]
+        queryset = self.filter_queryset(self.get_queryset()).values(*columns)
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(fast.rows(page))
+        return Response(fast.rows(queryset))
+
+
+class _NotModified(Exception):
+    pass
+
+
+class ConditionalCatalogMixin:
+    """
+    ETag / Last-Modified for a location ViewSet's read actions, taken from the
+    catalog version, so a client revalidating an unchanged catalog gets a 304
+    before any queryset or serializer work. Checked after authentication,
+    permissions and throttling; user-specific actions stay out of
+    `conditional_actions`.
+    """
+    conditional_actions = (
+        'list', 'retrieve', 'nearby',
+        'districts', 'by_district', 'service_types', 'by_service_type',
+    )
+    
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        self.catalog_validators = None
+        if request.method not in ('GET', 'HEAD') or self.action not in self.conditional_actions:
+            return
+        
+        version, updated_at = current_catalog_state()
+        # The representation also depends on the negotiated format
+        etag = f'"catalog-{version}-{request.accepted_renderer.format}"'
+        last_modified = int(updated_at.timestamp()) if updated_at else None
+        self.catalog_validators = (etag, last_modified)
+        if get_conditional_response(request._request, etag=etag, last_modified=last_modified) is not None:
+            raise _NotModified()
+    
+    def handle_exception(self, exc):
+        if isinstance(exc, _NotModified):
+            return Response(status=status.HTTP_304_NOT_MODIFIED)
+        return super().handle_exception(exc)
+    
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        validators = getattr(self, 'catalog_validators', None)
+        if validators and response.status_code in (status.HTTP_200_OK, status.HTTP_304_NOT_MODIFIED):
+            etag, last_modified = validators
+            response['ETag'] = etag
+            if last_modified is not None:
+                response['Last-Modified'] = http_date(last_modified)
+            # Always revalidate rather than trusting a heuristic freshness lifetime
+            patch_cache_control(response, no_cache=True)
+        return response
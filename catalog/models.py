@@ -0,0 +1,47 @@
+from django.db import models
+
+
+class CatalogVersion(models.Model):
+    """
+    Single-row counter bumped whenever a GI or ad location changes
+    Per-process indexes built from the catalog compare against it to know when to rebuild.
+    """
+    
+    version = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        verbose_name = 'Catalog Version'
+        verbose_name_plural = 'Catalog Version'
+    
+    def __str__(self):
+        return f"Catalog v{self.version}"
+
+
+class MapCluster(models.Model):
+    """
+    Map markers of one location type in one grid cell at one zoom level
+    Kept current by the catalog signals; see catalog/map_clusters.py for the grid.
+    """
+    
+    location_type = models.CharField(max_length=10)
+    zoom = models.PositiveSmallIntegerField()
+    cell_x = models.IntegerField()
+    cell_y = models.IntegerField()
+    count = models.IntegerField(default=0)
+    latitude_sum = models.FloatField(default=0)
+    longitude_sum = models.FloatField(default=0)
+    representative_ids = models.JSONField(default=list)
+    
+    class Meta:
+        verbose_name = 'Map Cluster'
+        verbose_name_plural = 'Map Clusters'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['zoom', 'location_type', 'cell_x', 'cell_y'],
+                name='unique_map_cluster_cell'
+            ),
+        ]
+    
+    def __str__(self):
+        return f"{self.location_type} z{self.zoom} ({self.cell_x}, {self.cell_y}): {self.count}"
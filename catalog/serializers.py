@@ -0,0 +1,32 @@
+from typing import Iterable, List, Tuple
+
+
+class SparseFieldsSerializerMixin:
+    """
+    Keeps only the fields named in context['fields'] (all of them when absent)
+    Meta.field_columns maps fields that are not plain model columns to the columns
+    they read ('related__column' for joined ones), so views can load exactly those.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        requested = self.context.get('fields')
+        if requested:
+            for name in set(self.fields) - set(requested):
+                self.fields.pop(name)
+
+    @classmethod
+    def columns_for(cls, field_names: Iterable[str]) -> Tuple[List[str], List[str]]:
+        """(arguments for .only(), relations for .select_related()) needed to render `field_names`"""
+        field_columns = getattr(cls.Meta, 'field_columns', {})
+        columns, related = [], []
+        for name in field_names:
+            for column in field_columns.get(name, [name]):
+                relation = column.split('__', 1)[0]
+                if relation != column and relation not in related:
+                    # A joined relation has to be loaded itself, not deferred
+                    related.append(relation)
+                    columns.append(relation)
+                if column not in columns:
+                    columns.append(column)
+        return columns, related
@@ -0,0 +1,95 @@
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models.signals import pre_save, post_save, pre_delete, post_delete
+from django.dispatch import receiver
+
+from home.models import GILocation
+from adver.models import AdLocation
+from .map_clusters import LOCATION_TYPES, add_location, remove_location
+from .versioning import bump_catalog_version
+
+
+# Columns a stored location's map position is read from (is_active only where the model has it)
+POSITION_FIELDS = ('latitude', 'longitude', 'is_active')
+
+
+@receiver(post_save, sender=GILocation)
+@receiver(post_save, sender=AdLocation)
+@receiver(post_delete, sender=GILocation)
+@receiver(post_delete, sender=AdLocation)
+def bump_version_on_change(sender, instance, **kwargs):
+    """Invalidate per-process catalog indexes once the change is committed"""
+    transaction.on_commit(bump_catalog_version)
+
+
+def _owns_locations(user) -> bool:
+    return (
+        GILocation.objects.filter(created_by=user).exists()
+        or AdLocation.objects.filter(created_by=user).exists()
+    )
+
+
+@receiver(pre_save, sender=User)
+def remember_username(sender, instance, update_fields=None, **kwargs):
+    """Keep the stored username so post_save can tell a rename (logins only save last_login)"""
+    instance._catalog_username = None
+    if instance.pk is None or (update_fields is not None and 'username' not in update_fields):
+        return
+    instance._catalog_username = sender.objects.filter(pk=instance.pk).values_list('username', flat=True).first()
+
+
+@receiver(post_save, sender=User)
+def bump_version_on_rename(sender, instance, created, **kwargs):
+    """Location payloads carry created_by_username, so renaming an owner changes the catalog"""
+    old = getattr(instance, '_catalog_username', None)
+    if not created and old is not None and old != instance.username and _owns_locations(instance):
+        transaction.on_commit(bump_catalog_version)
+
+
+@receiver(pre_delete, sender=User)
+def bump_version_on_owner_delete(sender, instance, **kwargs):
+    """Deleting an owner sets created_by to NULL on their locations without saving them"""
+    if _owns_locations(instance):
+        transaction.on_commit(bump_catalog_version)
+
+
+def _map_position(instance):
+    """(lat, lng) of a location as shown on the map, or None if it is hidden"""
+    if not getattr(instance, 'is_active', True):
+        return None
+    return float(instance.latitude), float(instance.longitude)
+
+
+@receiver(pre_save, sender=GILocation)
+@receiver(pre_save, sender=AdLocation)
+def remember_map_position(sender, instance, **kwargs):
+    """Keep the stored position so post_save can move the location between clusters"""
+    instance._map_position = None
+    if instance.pk is None:
+        return
+    fields = [name for name in POSITION_FIELDS if hasattr(sender, name)]
+    old = sender.objects.filter(pk=instance.pk).only(*fields).first()
+    if old is not None:
+        instance._map_position = _map_position(old)
+
+
+@receiver(post_save, sender=GILocation)
+@receiver(post_save, sender=AdLocation)
+def update_map_clusters_on_save(sender, instance, **kwargs):
+    old = getattr(instance, '_map_position', None)
+    new = _map_position(instance)
+    if old == new:
+        return
+    location_type = LOCATION_TYPES[sender]
+    if old is not None:
+        remove_location(location_type, instance.pk, *old)
+    if new is not None:
+        add_location(location_type, instance.pk, *new)
+
+
+@receiver(post_delete, sender=GILocation)
+@receiver(post_delete, sender=AdLocation)
+def update_map_clusters_on_delete(sender, instance, **kwargs):
+    position = _map_position(instance)
+    if position is not None:
+        remove_location(LOCATION_TYPES[sender], instance.pk, *position)
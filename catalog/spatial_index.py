@@ -0,0 +1,104 @@
+"""
+Location Spatial Index
+Process-local KD-trees over the coordinates of every GI and ad location, so the
+nearby endpoint finds the locations within a radius without scanning a bounding
+box of rows. Points live on the unit sphere (x, y, z), so Euclidean chord distance
+orders them exactly like great-circle distance. The trees are built lazily and
+rebuilt when the catalog version moves (see versioning.py); each gunicorn worker
+holds its own copy.
+"""
+import threading
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from scipy.spatial import cKDTree
+
+from .geo import EARTH_RADIUS_KM, haversine_km
+from .map_clusters import LOCATION_TYPES
+from .versioning import current_catalog_version
+
+
+def to_unit_sphere(lats: np.ndarray, lngs: np.ndarray) -> np.ndarray:
+    """(n, 3) array of unit vectors for latitude / longitude degrees"""
+    lat, lng = np.radians(lats), np.radians(lngs)
+    cos_lat = np.cos(lat)
+    return np.column_stack((cos_lat * np.cos(lng), cos_lat * np.sin(lng), np.sin(lat)))
+
+
+def chord_length(distance_km: float) -> float:
+    """Straight-line distance between unit vectors `distance_km` apart on the earth"""
+    return 2 * np.sin(min(distance_km / EARTH_RADIUS_KM, np.pi) / 2)
+
+
+class LocationIndex:
+    """KD-trees over one catalog version, one per location type ('gi', 'ad')"""
+
+    def __init__(self, version: int, rows: Dict[str, List[Tuple[int, float, float]]]):
+        self.version = version
+        self._trees = {}
+        for location_type, points in rows.items():
+            if points:
+                ids = np.array([row[0] for row in points])
+                lats = np.array([row[1] for row in points], dtype=float)
+                lngs = np.array([row[2] for row in points], dtype=float)
+                self._trees[location_type] = (cKDTree(to_unit_sphere(lats, lngs)), ids, lats, lngs)
+
+    def within(self, location_type: str, lat: float, lng: float,
+               radius_km: float) -> List[Tuple[int, float]]:
+        """(id, distance_km) of every location within `radius_km`, nearest first (ties by id)"""
+        entry = self._trees.get(location_type)
+        if entry is None:
+            return []
+        tree, ids, lats, lngs = entry
+
+        point = to_unit_sphere(np.array([lat]), np.array([lng]))[0]
+        # Slightly wider so points right on the radius are kept; the exact check follows
+        found = np.array(tree.query_ball_point(point, chord_length(radius_km) + 1e-9), dtype=int)
+        if not len(found):
+            return []
+
+        # Same formula as geo.rank_by_distance, so both rank (and round) alike
+        distances = haversine_km(lat, lng, lats[found], lngs[found])
+        inside = distances <= radius_km
+        found_ids, distances = ids[found[inside]], distances[inside]
+        order = np.lexsort((found_ids, distances))
+        return [(int(found_ids[i]), round(float(distances[i]), 3)) for i in order]
+
+
+def load_location_index(version: int) -> LocationIndex:
+    rows = {
+        location_type: [
+            (pk, float(lat), float(lng))
+            for pk, lat, lng in model.objects.order_by('id').values_list('id', 'latitude', 'longitude')
+        ]
+        for model, location_type in LOCATION_TYPES.items()
+    }
+    return LocationIndex(version, rows)
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_location_index() -> LocationIndex:
+    """The process-wide index, (re)built if the catalog changed since it was loaded"""
+    global _index
+    version = current_catalog_version()
+    index = _index
+    if index is None or index.version != version:
+        with _index_lock:
+            if _index is None or _index.version != version:
+                _index = load_location_index(version)
+            index = _index
+    return index
+
+
+def locations_within(model, lat: float, lng: float, radius_km: float) -> Optional[List[Tuple[int, float]]]:
+    """
+    (id, distance_km) of every `model` row within `radius_km`, nearest first,
+    or None if the model is not indexed
+    """
+    location_type = LOCATION_TYPES.get(model)
+    if location_type is None:
+        return None
+    return get_location_index().within(location_type, lat, lng, radius_km)
@@ -0,0 +1,397 @@
+from datetime import time
+from decimal import Decimal
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.test import override_settings
+from rest_framework.test import APITestCase
+
+from adver.models import AdLocation
+from adver.serializers import AdLocationListSerializer
+from home.models import GILocation
+from home.serializers import GILocationSerializer
+from . import spatial_index
+from .fast_serializers import FastRowSerializer
+
+
+# Throttle history lives in the default cache; a dummy cache never throttles
+NO_THROTTLE_CACHES = {'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}}
+
+# No image (NULL and empty), and relative storage names needing URL quoting
+GI_IMAGES = [None, '', 'gi_locations/palace.jpg', 'gi_locations/palace front é.jpg', 'gi_locations/a%b#c.png']
+COORDINATES = [
+    (Decimal('12.305100'), Decimal('76.655100')),
+    (Decimal('-0.000001'), Decimal('179.999999')),
+    (Decimal('0'), Decimal('-180')),
+    (Decimal('89.5'), Decimal('-76.1')),
+]
+
+
+@override_settings(CACHES=NO_THROTTLE_CACHES, CATALOG_FAST_SERIALIZERS=True)
+class FastRowSerializerParityTests(APITestCase):
+    """List pages rendered from values() rows must match the DRF serializers exactly"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='owner', password='pass')
+        # More rows than one page (PAGE_SIZE 50) so cursor pages have next / previous links
+        GILocation.objects.bulk_create([
+            GILocation(
+                name=f'GI {i:03d}',
+                district=['Mysore', 'Hampi', 'Udupi'][i % 3],
+                latitude=COORDINATES[i % 4][0],
+                longitude=COORDINATES[i % 4][1],
+                description='d' * (i % 7),
+                image=GI_IMAGES[i % 5],
+                opening_time=time(9, 5, 7) if i % 2 else None,
+                closing_time=time(18) if i % 3 else None,
+                typical_visit_duration=[30, 60, 90][i % 3],
+                sellable_quantity=i if i % 5 else None,
+                created_by=cls.user if i % 2 else None,
+            )
+            for i in range(70)
+        ])
+        AdLocation.objects.bulk_create([
+            AdLocation(
+                name=f'Ad {i:03d}',
+                district=['Mysore', 'Hampi'][i % 2],
+                latitude=COORDINATES[i % 4][0],
+                longitude=COORDINATES[i % 4][1],
+                description='x',
+                image='ad_locations/hotel.jpg' if i % 3 else None,
+                service_type=['hotel', 'restaurant'][i % 2],
+                price_range='₹₹₹' if i % 2 else '',
+                created_by=cls.user if i % 2 else None,
+            )
+            for i in range(60)
+        ])
+
+    def get_both(self, url, **extra):
+        """The response of `url` through the DRF serializer and through the fast path"""
+        with self.settings(CATALOG_FAST_SERIALIZERS=False):
+            slow = self.client.get(url, **extra)
+        with mock.patch.object(FastRowSerializer, 'rows', autospec=True, side_effect=FastRowSerializer.rows) as rows:
+            fast = self.client.get(url, **extra)
+        return slow, fast, rows.called
+
+    def assertParity(self, url, **extra):
+        slow, fast, used_fast_path = self.get_both(url, **extra)
+        self.assertEqual(slow.status_code, 200, slow.content)
+        self.assertTrue(used_fast_path, f'{url} did not use the fast path')
+        self.assertEqual(fast.status_code, slow.status_code)
+        self.assertEqual(fast.content, slow.content)
+        return fast.json()
+
+    def test_serializer_rows_match_drf_serializer(self):
+        request = self.client.get('/api/gi-locations/').wsgi_request
+        for serializer_class, queryset in (
+            (GILocationSerializer, GILocation.objects.order_by('id')),
+            (AdLocationListSerializer, AdLocation.objects.order_by('id')),
+        ):
+            for fields in (None, ['id', 'latitude', 'longitude'], ['image'], ['created_by']):
+                context = {'request': request, 'fields': fields}
+                fast = FastRowSerializer(serializer_class, context)
+                with self.subTest(serializer=serializer_class.__name__, fields=fields):
+                    self.assertEqual(
+                        fast.rows(queryset.values(*fast.columns)),
+                        serializer_class(queryset, many=True, context=context).data
+                    )
+
+    def test_page_number_pages(self):
+        for url in (
+            '/api/gi-locations/',
+            '/api/gi-locations/?page=2',
+            '/api/gi-locations/?ordering=-created_at',
+            '/api/gi-locations/?district=Hampi',
+            '/api/ad-locations/',
+            '/api/ad-locations/?page=2',
+            '/api/ad-locations/?service_type=hotel',
+        ):
+            with self.subTest(url=url):
+                self.assertParity(url)
+
+    def test_cursor_pages(self):
+        for url in ('/api/gi-locations/?cursor=', '/api/ad-locations/?cursor=&fields=id,name,service_type_display'):
+            pages = 0
+            while url:
+                with self.subTest(url=url):
+                    data = self.assertParity(url)
+                url = data['next']
+                pages += 1
+            self.assertGreater(pages, 1)
+
+        last = self.assertParity('/api/gi-locations/?cursor=')
+        following = self.assertParity(last['next'])
+        self.assertParity(following['previous'])
+
+    def test_sparse_fieldsets(self):
+        for url in (
+            '/api/gi-locations/?fields=id,name,latitude,longitude',
+            '/api/gi-locations/?fields=image_url',
+            '/api/gi-locations/?fields=id,image,image_url,created_by,created_by_username',
+            '/api/gi-locations/?fields=opening_time,closing_time,created_at,updated_at',
+            '/api/ad-locations/?fields=service_type_display,price_range',
+            '/api/ad-locations/?fields=id,image&cursor=',
+        ):
+            with self.subTest(url=url):
+                data = self.assertParity(url)
+                requested = url.split('fields=')[1].split('&')[0].split(',')
+                self.assertEqual(list(data['results'][0]), requested)
+
+    def test_null_created_by(self):
+        data = self.assertParity('/api/gi-locations/?fields=id,created_by,created_by_username')
+        rows = {row['id']: row for row in data['results']}
+        orphans = GILocation.objects.filter(created_by=None, id__in=rows).values_list('id', flat=True)
+        self.assertTrue(orphans)
+        for pk in orphans:
+            # A missing relation leaves the dotted-source field out, as DRF does
+            self.assertEqual(rows[pk], {'id': pk, 'created_by': None})
+
+    @override_settings(ALLOWED_HOSTS=['testserver', 'example.com'])
+    def test_image_paths(self):
+        # Absolute URLs are built from the request's scheme and host
+        for extra in ({}, {'HTTP_HOST': 'example.com:8443', 'secure': True}):
+            with self.subTest(**extra):
+                data = self.assertParity('/api/gi-locations/?fields=id,image,image_url&ordering=name', **extra)
+                images = {row['image'] for row in data['results']}
+                self.assertIn(None, images)
+                self.assertTrue(any(image and '%20' in image for image in images))
+                self.assertTrue(all(image is None or image.startswith(('http://', 'https://')) for image in images))
+
+    def test_decimal_coordinates(self):
+        data = self.assertParity('/api/gi-locations/?fields=latitude,longitude')
+        coordinates = {(row['latitude'], row['longitude']) for row in data['results']}
+        self.assertIn(('-0.000001', '179.999999'), coordinates)
+        self.assertIn(('0.000000', '-180.000000'), coordinates)
+        self.assertIn(('89.500000', '-76.100000'), coordinates)
+
+    def test_decimal_coordinates_as_numbers(self):
+        with self.settings(REST_FRAMEWORK={**settings.REST_FRAMEWORK, 'COERCE_DECIMAL_TO_STRING': False}):
+            data = self.assertParity('/api/gi-locations/?fields=latitude,longitude')
+        self.assertIn({'latitude': -0.000001, 'longitude': 179.999999}, data['results'])
+
+
+@override_settings(CACHES=NO_THROTTLE_CACHES)
+class NearbyTests(APITestCase):
+    """The KD-tree and the bounding-box scan must return the same nearby pages"""
+
+    @classmethod
+    def setUpTestData(cls):
+        # A grid around Mysore, plus points by the antimeridian and the pole
+        GILocation.objects.bulk_create([
+            GILocation(
+                name=f'GI {i:03d}', district=['Mysore', 'Hampi'][i % 2],
+                latitude=Decimal('12.3') + Decimal(i % 10) / 50,
+                longitude=Decimal('76.6') + Decimal(i // 10) / 50,
+                typical_visit_duration=60,
+            )
+            for i in range(100)
+        ] + [
+            GILocation(name='East', district='Edge', latitude=Decimal('10'), longitude=Decimal('179.99')),
+            GILocation(name='West', district='Edge', latitude=Decimal('10'), longitude=Decimal('-179.99')),
+            GILocation(name='Pole', district='Edge', latitude=Decimal('89.99'), longitude=Decimal('0')),
+        ])
+        AdLocation.objects.bulk_create([
+            AdLocation(
+                name=f'Ad {i:03d}', district='Mysore',
+                latitude=Decimal('12.3') + Decimal(i) / 100, longitude=Decimal('76.65'),
+                service_type=['hotel', 'restaurant'][i % 2], is_active=bool(i % 3),
+            )
+            for i in range(30)
+        ])
+
+    def setUp(self):
+        # bulk_create sends no signals, so the catalog version does not move
+        spatial_index._index = None
+
+    def assertSameResults(self, url):
+        with self.settings(CATALOG_SPATIAL_INDEX=False):
+            scan = self.client.get(url)
+        with self.settings(CATALOG_SPATIAL_INDEX=True):
+            indexed = self.client.get(url)
+        self.assertEqual(scan.status_code, 200, scan.content)
+        self.assertEqual(indexed.content, scan.content)
+        return indexed.json()
+
+    def test_index_matches_scan(self):
+        for url in (
+            '/api/gi-locations/nearby/?lat=12.4&lng=76.7&radius_km=5',
+            '/api/gi-locations/nearby/?lat=12.4&lng=76.7&radius_km=50&page=2',
+            '/api/gi-locations/nearby/?lat=12.4&lng=76.7&radius_km=50&district=Hampi',
+            '/api/gi-locations/nearby/?lat=10&lng=180&radius_km=5',
+            '/api/gi-locations/nearby/?lat=90&lng=0&radius_km=5',
+            '/api/gi-locations/nearby/?lat=0&lng=0&radius_km=5',
+            '/api/ad-locations/nearby/?lat=12.4&lng=76.65&radius_km=20&service_type=hotel',
+        ):
+            with self.subTest(url=url):
+                self.assertSameResults(url)
+
+    def test_filters_and_order(self):
+        data = self.assertSameResults('/api/ad-locations/nearby/?lat=12.3&lng=76.65&radius_km=200')
+        rows = data['results']
+        inactive = set(AdLocation.objects.filter(is_active=False).values_list('id', flat=True))
+        self.assertTrue(rows)
+        self.assertFalse(inactive & {row['id'] for row in rows})
+        distances = [row['distance_km'] for row in rows]
+        self.assertEqual(distances, sorted(distances))
+
+        # Many candidates are checked with one bounding-box query instead of an IN list
+        with mock.patch('catalog.geo.MAX_CANDIDATE_LOOKUP', 5):
+            self.assertSameResults('/api/gi-locations/nearby/?lat=12.4&lng=76.7&radius_km=50&district=Hampi')
+
+        data = self.assertSameResults('/api/gi-locations/nearby/?lat=10&lng=-180&radius_km=5')
+        self.assertEqual({row['name'] for row in data['results']}, {'East', 'West'})
+
+
+@override_settings(CACHES=NO_THROTTLE_CACHES)
+class KeysetPaginationTests(APITestCase):
+    """Cursor pages must cover the ordered list exactly, whatever ties fall on a page boundary"""
+
+    @classmethod
+    def setUpTestData(cls):
+        # Few districts and repeated names, so most sort keys only differ by id
+        GILocation.objects.bulk_create([
+            GILocation(
+                name=['Fort', 'Temple'][i % 2] if i % 4 else 'Fort',
+                district=['Mysore', 'Hampi'][i % 2] if i < 100 else 'Mysore',
+                latitude=Decimal('12.3'), longitude=Decimal('76.6'), description='d',
+            )
+            for i in range(130)
+        ])
+        AdLocation.objects.bulk_create([
+            AdLocation(
+                name='Stay', district='Hampi', latitude=Decimal('12.3'), longitude=Decimal('76.6'),
+                description='x', service_type=['hotel', 'restaurant'][i % 2],
+            )
+            for i in range(110)
+        ])
+
+    def walk(self, url, link='next'):
+        """Every page reached by following `link` from `url`"""
+        pages = []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200, response.content)
+            pages.append(response.json())
+            url = pages[-1][link]
+        return pages
+
+    def ids(self, pages):
+        return [row['id'] for page in pages for row in page['results']]
+
+    def test_walk_forward(self):
+        for url, queryset in (
+            ('/api/gi-locations/?cursor=&fields=id', GILocation.objects.order_by('district', 'name', 'id')),
+            ('/api/gi-locations/?cursor=&fields=id&district=Mysore',
+             GILocation.objects.filter(district='Mysore').order_by('name', 'id')),
+            ('/api/ad-locations/?cursor=&fields=id',
+             AdLocation.objects.order_by('district', 'service_type', 'name', 'id')),
+        ):
+            with self.subTest(url=url):
+                pages = self.walk(url)
+                self.assertEqual(self.ids(pages), list(queryset.values_list('id', flat=True)))
+                self.assertGreater(len(pages), 1)
+                self.assertIsNone(pages[0]['previous'])
+                self.assertTrue(all(len(page['results']) == 50 for page in pages[:-1]))
+
+    def test_walk_back(self):
+        pages = self.walk('/api/gi-locations/?cursor=&fields=id')
+        back = self.walk(pages[-1]['previous'], link='previous')
+        # Walking back revisits the earlier pages, each still in forward order
+        self.assertEqual(back, [
+            {**page, 'next': back_page['next'], 'previous': back_page['previous']}
+            for page, back_page in zip(pages[-2::-1], back)
+        ])
+        self.assertIsNone(back[-1]['previous'])
+        # Going forward from a page reached backwards lands on the same next page
+        for page, back_page in zip(pages[-1:0:-1], back):
+            self.assertEqual(self.client.get(back_page['next']).json()['results'], page['results'])
+
+    def test_rows_added_behind_the_cursor(self):
+        first = self.client.get('/api/gi-locations/?cursor=&fields=id').json()
+        # Sorts before every row already shown; later cursor pages do not shift
+        GILocation.objects.create(
+            name='Aaa', district='Hampi', latitude=Decimal('12.3'), longitude=Decimal('76.6'), description='d'
+        )
+        expected = list(GILocation.objects.order_by('district', 'name', 'id').values_list('id', flat=True))
+        self.assertEqual(self.ids([first] + self.walk(first['next'])), expected[1:])
+
+    def test_invalid_cursor(self):
+        # Garbage, and a well-formed cursor with the wrong number of sort keys
+        for cursor in ('nonsense', 'eyJwIjpbMV0sInIiOjB9'):
+            with self.subTest(cursor=cursor):
+                self.assertEqual(self.client.get(f'/api/gi-locations/?cursor={cursor}').status_code, 404)
+        response = self.client.get('/api/gi-locations/?cursor=&ordering=-created_at')
+        self.assertEqual(response.status_code, 400)
+
+
+@override_settings(CACHES=NO_THROTTLE_CACHES, CATALOG_VERSION_CHECK_SECONDS=0)
+class ConditionalCatalogTests(APITestCase):
+    """Catalog reads revalidate with ETag / If-None-Match against the catalog version"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = User.objects.create_user(username='owner', password='pass')
+        cls.location = GILocation.objects.create(
+            name='Palace', district='Mysore', latitude=Decimal('12.3051'), longitude=Decimal('76.6551'),
+            description='d', created_by=cls.owner,
+        )
+
+    def revalidate(self, url, etag):
+        return self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+    def test_not_modified(self):
+        for url in ('/api/gi-locations/', f'/api/gi-locations/{self.location.id}/', '/api/gi-locations/districts/'):
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertEqual(response.status_code, 200)
+                self.assertIn('no-cache', response['Cache-Control'])
+                revalidated = self.revalidate(url, response['ETag'])
+                self.assertEqual(revalidated.status_code, 304)
+                self.assertEqual(revalidated['ETag'], response['ETag'])
+                self.assertEqual(revalidated.content, b'')
+
+    def test_location_change(self):
+        etag = self.client.get('/api/gi-locations/')['ETag']
+        with self.captureOnCommitCallbacks(execute=True):
+            self.location.name = 'Mysore Palace'
+            self.location.save()
+        response = self.revalidate('/api/gi-locations/', etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual(response.json()['results'][0]['name'], 'Mysore Palace')
+
+    def test_owner_rename(self):
+        url = f'/api/gi-locations/{self.location.id}/'
+        etag = self.client.get(url)['ETag']
+        with self.captureOnCommitCallbacks(execute=True):
+            self.owner.username = 'renamed'
+            self.owner.save()
+        response = self.revalidate(url, etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['created_by_username'], 'renamed')
+
+    def test_login_keeps_version(self):
+        url = '/api/gi-locations/'
+        etag = self.client.get(url)['ETag']
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            self.assertTrue(self.client.login(username='owner', password='pass'))
+            self.client.logout()
+        self.assertEqual(callbacks, [])
+        self.assertEqual(self.revalidate(url, etag).status_code, 304)
+
+    def test_other_formats_and_writes(self):
+        etag = self.client.get('/api/gi-locations/')['ETag']
+        # A different representation never matches the JSON ETag
+        response = self.client.get('/api/gi-locations/', HTTP_ACCEPT='application/msgpack', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        # Writes and user-specific actions are not conditional
+        self.client.force_authenticate(self.owner)
+        response = self.client.patch(
+            f'/api/gi-locations/{self.location.id}/',
+            {'name': 'Palace', 'latitude': '12.3051', 'longitude': '76.6551'},
+            HTTP_IF_NONE_MATCH=etag
+        )
+        self.assertEqual(response.status_code, 200)
@@ -0,0 +1,7 @@
+from django.urls import path
+from .views import AutocompleteView, MapClustersView
+
+urlpatterns = [
+    path('autocomplete/', AutocompleteView.as_view(), name='autocomplete'),
+    path('map/clusters/', MapClustersView.as_view(), name='map-clusters'),
+]
@@ -0,0 +1,57 @@
+"""
+Catalog Versioning
+Every server process keeps in-memory indexes of the location catalog. They are
+tagged with the CatalogVersion they were built from and rebuilt once it moves.
+Reading the version is one primary-key lookup, done at most every
+CATALOG_VERSION_CHECK_SECONDS per process; changes made by the same process are
+seen immediately.
+"""
+import time
+from datetime import datetime
+from typing import Optional, Tuple
+
+from django.conf import settings
+from django.db.models import F
+from django.utils import timezone
+
+from .models import CatalogVersion
+
+
+CATALOG_VERSION_ID = 1
+
+_cached_state = None
+_checked_at = 0.0
+
+
+def bump_catalog_version() -> None:
+    """Record that the catalog changed"""
+    global _cached_state
+    updated = CatalogVersion.objects.filter(pk=CATALOG_VERSION_ID).update(
+        version=F('version') + 1,
+        updated_at=timezone.now()
+    )
+    if not updated:
+        CatalogVersion.objects.get_or_create(pk=CATALOG_VERSION_ID, defaults={'version': 1})
+    _cached_state = None
+
+
+def current_catalog_state() -> Tuple[int, Optional[datetime]]:
+    """(version, time of the last change), re-read from the database at most every few seconds"""
+    global _cached_state, _checked_at
+    now = time.monotonic()
+    max_age = getattr(settings, 'CATALOG_VERSION_CHECK_SECONDS', 2.0)
+    if _cached_state is None or now - _checked_at >= max_age:
+        state = (
+            CatalogVersion.objects
+            .filter(pk=CATALOG_VERSION_ID)
+            .values_list('version', 'updated_at')
+            .first()
+        )
+        _cached_state = state or (0, None)
+        _checked_at = now
+    return _cached_state
+
+
+def current_catalog_version() -> int:
+    """The catalog version, re-read from the database at most every few seconds"""
+    return current_catalog_state()[0]
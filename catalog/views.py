@@ -0,0 +1,69 @@
+from rest_framework import status
+from rest_framework.permissions import AllowAny
+from rest_framework.response import Response
+from rest_framework.throttling import ScopedRateThrottle
+from rest_framework.views import APIView
+
+from .autocomplete import get_autocomplete_index, MAX_SUGGESTIONS
+from .map_clusters import clusters_in_bbox, LOCATION_TYPES
+
+
+class AutocompleteView(APIView):
+    """
+    GET /api/autocomplete/?q=mys&limit=10
+    Suggestions across GI / ad location names and districts, served from memory
+    """
+    permission_classes = [AllowAny]
+    throttle_classes = [ScopedRateThrottle]
+    throttle_scope = 'autocomplete'
+    
+    def get(self, request):
+        query = request.query_params.get('q', '')
+        try:
+            limit = int(request.query_params.get('limit', MAX_SUGGESTIONS))
+        except ValueError:
+            limit = MAX_SUGGESTIONS
+        limit = max(1, min(limit, MAX_SUGGESTIONS))
+        
+        return Response({
+            'query': query,
+            'results': get_autocomplete_index().suggest(query, limit)
+        })
+
+
+class MapClustersView(APIView):
+    """
+    GET /api/map/clusters/?bbox=min_lng,min_lat,max_lng,max_lat&zoom=10&type=gi
+    Precomputed marker clusters inside a map viewport; `type` (gi | ad) is optional
+    """
+    permission_classes = [AllowAny]
+    throttle_classes = [ScopedRateThrottle]
+    throttle_scope = 'map'
+    
+    def get(self, request):
+        try:
+            min_lng, min_lat, max_lng, max_lat = (
+                float(value) for value in request.query_params.get('bbox', '').split(',')
+            )
+            zoom = int(request.query_params.get('zoom', ''))
+        except ValueError:
+            return Response(
+                {'error': 'bbox must be min_lng,min_lat,max_lng,max_lat and zoom an integer'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if not (-180 <= min_lng <= 180 and -180 <= max_lng <= 180
+                and -90 <= min_lat <= max_lat <= 90):
+            return Response(
+                {'error': 'bbox is outside -180..180 / -90..90 or min_lat > max_lat'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        location_type = request.query_params.get('type')
+        if location_type and location_type not in LOCATION_TYPES.values():
+            return Response(
+                {'error': "type must be 'gi' or 'ad'"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        zoom, clusters = clusters_in_bbox(min_lng, min_lat, max_lng, max_lat, zoom, location_type)
+        return Response({'zoom': zoom, 'clusters': clusters})
@@ -5,6 +5,7 @@
 # - installs requirements
 # - runs migrations and collectstatic
 # - creates a systemd service file for gunicorn (template)
+# - creates a systemd service file for the schedule worker and (re)starts it
 # - outputs the nginx site config path to copy/enable
 
 set -euo pipefail
@@ -13,6 +14,7 @@ VENV_DIR="$APP_DIR/.venv"
 USER=www-data
 GROUP=www-data
 SERVICE_NAME=giyatra
+WORKER_SERVICE_NAME=${SERVICE_NAME}-worker
 GUNICORN_SOCKET=/run/gunicorn-${SERVICE_NAME}.sock
 
 echo "Deploying to $APP_DIR"
@@ -47,8 +49,32 @@ ExecStart=${APP_DIR}/.venv/bin/gunicorn --access-logfile - --workers 3 --bind un
 WantedBy=multi-user.target
 EOF
 
+# Create systemd service file for the background schedule worker
+WORKER_SERVICE_FILE="/etc/systemd/system/${WORKER_SERVICE_NAME}.service"
+cat <<EOF | sudo tee "$WORKER_SERVICE_FILE"
+[Unit]
+Description=schedule generation worker for Giyatra
+After=network.target
+
+[Service]
+User=${USER}
+Group=${GROUP}
+WorkingDirectory=${APP_DIR}
+ExecStart=${VENV_DIR}/bin/python manage.py run_schedule_worker --workers 2
+Restart=always
+# SIGINT lets running jobs finish before the worker exits
+KillSignal=SIGINT
+TimeoutStopSec=60
+
+[Install]
+WantedBy=multi-user.target
+EOF
+
 sudo systemctl daemon-reload
 sudo systemctl enable --now ${SERVICE_NAME}
+sudo systemctl enable ${WORKER_SERVICE_NAME}
+# Restart so a redeploy runs jobs with the new code
+sudo systemctl restart ${WORKER_SERVICE_NAME}
 
 # Nginx config template location
 NGINX_SITE="/etc/nginx/sites-available/giyatra"
@@ -88,4 +114,4 @@ echo "Deployment template finished. If you have a public domain, run certbot to
 
 echo "Example: sudo certbot --nginx -d yourdomain.com -d www.yourdomain.com"
 
-echo "If you need rollback, stop the systemd service: sudo systemctl stop ${SERVICE_NAME}"
\ No newline at end of file
+echo "If you need rollback, stop the systemd services: sudo systemctl stop ${SERVICE_NAME} ${WORKER_SERVICE_NAME}"
\ No newline at end of file
@@ -0,0 +1,142 @@
+"""
+API Pagination
+Page numbers by default; list endpoints of views that declare `cursor_ordering`
+also serve keyset (cursor) pages when ?cursor= is given. A cursor holds the sort
+key of the row it continues from, so every page is one index range scan with no
+OFFSET and no COUNT(*): page N costs the same as page 1.
+"""
+import base64
+import binascii
+import json
+from collections import OrderedDict
+
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import F, Field, Func, QuerySet, Value
+from django.db.models.lookups import GreaterThan, LessThan
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+def _row(*expressions) -> Func:
+    """SQL row constructor; compared element by element, like the composite index it maps to"""
+    return Func(*expressions, function='ROW', output_field=Field())
+
+
+class PageNumberOrCursorPagination(PageNumberPagination):
+    """
+    Keyset pages are ordered by the view's `cursor_ordering`, e.g.
+    ('district', 'name', 'id'): the default ordering plus a unique tie-breaker,
+    all ascending or all descending. Other orderings (?ordering=, ?search=
+    ranking) only support page numbers.
+    """
+    cursor_query_param = 'cursor'
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        ordering = getattr(view, 'cursor_ordering', None)
+        self.cursor_mode = (
+            self.cursor_query_param in request.query_params
+            and ordering is not None
+            and isinstance(queryset, QuerySet)
+        )
+        if not self.cursor_mode:
+            return super().paginate_queryset(queryset, request, view)
+
+        self.request = request
+        self.ordering = list(ordering)
+        self.fields = [name.lstrip('-') for name in self.ordering]
+        self.descending = self.ordering[0].startswith('-')
+
+        current = list(queryset.query.order_by or queryset.model._meta.ordering)
+        # The tie-breaker may be left out of the view's own ordering
+        if current not in (self.ordering, self.ordering[:-1]):
+            raise ValidationError({
+                'cursor': 'Cursor pagination only supports the default ordering; use page numbers instead'
+            })
+
+        page_size = self.get_page_size(request)
+        position, reverse = self.decode_cursor(queryset.model, request.query_params[self.cursor_query_param])
+
+        # Walking backwards flips both the comparison and the sort direction
+        descending = self.descending != reverse
+        if position is not None:
+            lookup = LessThan if descending else GreaterThan
+            queryset = queryset.filter(lookup(
+                _row(*(F(name) for name in self.fields)),
+                _row(*(Value(value, output_field=queryset.model._meta.get_field(name))
+                       for name, value in zip(self.fields, position)))
+            ))
+        queryset = queryset.order_by(*(('-' if descending else '') + name for name in self.fields))
+
+        rows = list(queryset[:page_size + 1])
+        has_more = len(rows) > page_size
+        rows = rows[:page_size]
+        if reverse:
+            rows.reverse()
+
+        if reverse:
+            self.has_next, self.has_previous = position is not None, has_more
+        else:
+            self.has_next, self.has_previous = has_more, position is not None
+        self.first_row = rows[0] if rows else None
+        self.last_row = rows[-1] if rows else None
+        return rows
+
+    def get_paginated_response(self, data):
+        if not self.cursor_mode:
+            return super().get_paginated_response(data)
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data),
+        ]))
+
+    def get_next_link(self):
+        if not self.cursor_mode:
+            return super().get_next_link()
+        if not self.has_next or self.last_row is None:
+            return None
+        return self.cursor_link(self.last_row, reverse=False)
+
+    def get_previous_link(self):
+        if not self.cursor_mode:
+            return super().get_previous_link()
+        if not self.has_previous:
+            return None
+        if self.first_row is None:
+            # Walked past the end: start over from the beginning
+            return replace_query_param(
+                remove_query_param(self.request.build_absolute_uri(), self.page_query_param),
+                self.cursor_query_param, ''
+            )
+        return self.cursor_link(self.first_row, reverse=True)
+
+    def cursor_link(self, row, reverse: bool) -> str:
+        if isinstance(row, dict):
+            # Pages of queryset.values() rows
+            position = [row[name] for name in self.fields]
+        else:
+            position = [getattr(row, row._meta.get_field(name).attname) for name in self.fields]
+        # Full isoformat: DjangoJSONEncoder would cut datetimes to milliseconds
+        position = [value.isoformat() if hasattr(value, 'isoformat') else value for value in position]
+        payload = json.dumps({'p': position, 'r': int(reverse)}, cls=DjangoJSONEncoder, separators=(',', ':'))
+        cursor = base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+        url = remove_query_param(self.request.build_absolute_uri(), self.page_query_param)
+        return replace_query_param(url, self.cursor_query_param, cursor)
+
+    def decode_cursor(self, model, cursor: str):
+        """(sort key to continue from or None for the first page, walking backwards?)"""
+        if not cursor:
+            return None, False
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+            position, reverse = payload['p'], bool(payload['r'])
+            if len(position) != len(self.fields):
+                raise ValueError
+            position = [model._meta.get_field(name).to_python(value) for name, value in zip(self.fields, position)]
+        except (binascii.Error, ValueError, TypeError, KeyError, DjangoValidationError):
+            raise NotFound(self.invalid_cursor_message)
+        return position, reverse
@@ -0,0 +1,94 @@
+"""
+API Renderers
+JSON is rendered with orjson, and MessagePack is offered to clients that ask
+for it with `Accept: application/msgpack`. Values orjson / msgpack do not handle
+natively (Decimal, date / time / datetime, lazy strings, numpy values) go through
+DRF's own JSON encoder, so both formats carry the same values JSONRenderer would.
+JSON floats are spelled by orjson (1e-5, 1e16 rather than 1e-05, 1e+16) and parse
+back to the same numbers; NaN / Infinity, which orjson would write as null, are
+handed to JSONRenderer so they are rejected (or written) as it does.
+"""
+import math
+from decimal import Decimal
+
+import msgpack
+import orjson
+from django.utils.cache import patch_vary_headers
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+
+# DRF's conversions: Decimal -> float, datetimes -> ISO 8601 with 'Z' for UTC, ...
+_encode_default = JSONEncoder().default
+
+ORJSON_OPTIONS = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+
+
+def _has_non_finite(data) -> bool:
+    """Whether a float / Decimal NaN or Infinity occurs anywhere in `data`"""
+    stack = [[data]]
+    while stack:
+        container = stack.pop()
+        for value in (container.values() if isinstance(container, dict) else container):
+            kind = type(value)
+            # Most values are plain scalars; skip them before any isinstance() check
+            if kind is str or kind is int or kind is bool or value is None:
+                continue
+            if isinstance(value, (dict, list, tuple)):
+                stack.append(value)
+            elif isinstance(value, float):
+                if not math.isfinite(value):
+                    return True
+            elif isinstance(value, Decimal) and not value.is_finite():
+                return True
+    return False
+
+
+class _VaryOnAcceptMixin:
+    """The same URL renders differently per Accept header; tell caches so"""
+
+    def vary_on_accept(self, renderer_context):
+        response = (renderer_context or {}).get('response')
+        if response is not None:
+            patch_vary_headers(response, ('Accept',))
+
+
+class ORJSONRenderer(_VaryOnAcceptMixin, JSONRenderer):
+    """
+    Drop-in JSONRenderer producing compact UTF-8 JSON with the same values
+    Indented output (?format=json with `indent=`, the browsable API), anything
+    orjson rejects and non-finite floats fall back to the stdlib implementation.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        self.vary_on_accept(renderer_context)
+        if data is None:
+            return b''
+        if not self.compact or self.ensure_ascii or \
+                self.get_indent(accepted_media_type, renderer_context or {}) is not None:
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            ret = orjson.dumps(data, default=_encode_default, option=ORJSON_OPTIONS)
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type, renderer_context)
+        # orjson writes NaN / Infinity as null; only output with a null can hide one
+        if b'null' in ret and _has_non_finite(data):
+            return super().render(data, accepted_media_type, renderer_context)
+        # Keep the output a strict JavaScript subset, as JSONRenderer does
+        if b'\xe2\x80\xa8' in ret or b'\xe2\x80\xa9' in ret:
+            ret = ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+        return ret
+
+
+class MessagePackRenderer(_VaryOnAcceptMixin, BaseRenderer):
+    """MessagePack; selected by `Accept: application/msgpack` or ?format=msgpack"""
+    media_type = 'application/msgpack'
+    format = 'msgpack'
+    charset = None
+    render_style = 'binary'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        self.vary_on_accept(renderer_context)
+        if data is None:
+            return b''
+        return msgpack.packb(data, default=_encode_default, use_bin_type=True, datetime=False)
@@ -44,6 +44,7 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django.contrib.postgres",
 
     # Third-party apps
     "rest_framework",
@@ -54,6 +55,7 @@ INSTALLED_APPS = [
     "home",
     "adver",
     "itinerary",
+    "catalog",
     "admin_panel",
     # Local accounts app (provides auth endpoints and models)
     "accounts",
@@ -182,7 +184,13 @@ REST_FRAMEWORK = {
         "rest_framework.authentication.TokenAuthentication",
         "rest_framework.authentication.SessionAuthentication",
     ],
-    "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.PageNumberPagination",
+    # orjson by default; MessagePack for `Accept: application/msgpack`
+    "DEFAULT_RENDERER_CLASSES": [
+        "giyatra_project.renderers.ORJSONRenderer",
+        "giyatra_project.renderers.MessagePackRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ],
+    "DEFAULT_PAGINATION_CLASS": "giyatra_project.pagination.PageNumberOrCursorPagination",
     "PAGE_SIZE": 50,
     "DEFAULT_FILTER_BACKENDS": [
         "rest_framework.filters.SearchFilter",
@@ -197,9 +205,47 @@ REST_FRAMEWORK = {
         "user": "20/minute",
         "signup_otp": "3/minute",
         "password_reset_otp": "3/minute",
+        # Fired on every keystroke of the search box
+        "autocomplete": "120/minute",
+        # Fired on every map pan / zoom
+        "map": "60/minute",
     },
 }
 
+# ------------------------------------------------------------
+# ITINERARY SCHEDULE GENERATION
+# ------------------------------------------------------------
+# generate_schedule queues the work for `manage.py run_schedule_worker` and returns
+# a job to poll; turn off to generate in the request (e.g. without a worker running)
+ITINERARY_SCHEDULE_JOBS = os.environ.get("ITINERARY_SCHEDULE_JOBS", "True").lower() == "true"
+
+# Per-process LRU of generated schedules (see itinerary/schedule_cache.py)
+ITINERARY_SCHEDULE_CACHE_MAX_ENTRIES = int(os.environ.get("ITINERARY_SCHEDULE_CACHE_MAX_ENTRIES", "256"))
+ITINERARY_SCHEDULE_CACHE_MAX_BYTES = int(os.environ.get("ITINERARY_SCHEDULE_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+
+# Processes per server process for refining days of long trips in parallel
+# (see itinerary/solver_pool.py); 0 refines serially
+ITINERARY_SOLVER_WORKERS = int(os.environ.get("ITINERARY_SOLVER_WORKERS", "0"))
+
+# Use legs stored in the TravelLeg table (e.g. from a routing service) instead of
+# haversine estimates where present (see itinerary/travel_cache.py)
+ITINERARY_STORED_TRAVEL_LEGS = os.environ.get("ITINERARY_STORED_TRAVEL_LEGS", "False").lower() == "true"
+
+# ------------------------------------------------------------
+# CATALOG INDEXES
+# ------------------------------------------------------------
+# How often each process re-reads the catalog version to notice location changes
+# made by other processes (see catalog/versioning.py)
+CATALOG_VERSION_CHECK_SECONDS = float(os.environ.get("CATALOG_VERSION_CHECK_SECONDS", "2"))
+
+# Answer nearby searches from a per-process KD-tree of location coordinates
+# (see catalog/spatial_index.py) instead of a bounding-box scan of the table
+CATALOG_SPATIAL_INDEX = os.environ.get("CATALOG_SPATIAL_INDEX", "True").lower() == "true"
+
+# Render location list pages from queryset.values() rows instead of a ModelSerializer
+# per object (see catalog/fast_serializers.py); the JSON is the same either way
+CATALOG_FAST_SERIALIZERS = os.environ.get("CATALOG_FAST_SERIALIZERS", "True").lower() == "true"
+
 # ------------------------------------------------------------
 # CORS CONFIGURATION
 # ------------------------------------------------------------
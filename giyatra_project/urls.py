@@ -12,6 +12,7 @@ urlpatterns = [
     path('api/', include('home.urls')),
     path('api/', include('adver.urls')),
     path('api/', include('itinerary.urls')),
+    path('api/', include('catalog.urls')),
     path('api/', include('accounts.urls')),
 ]
 
@@ -0,0 +1,19 @@
+# Generated by Django 5.0.7 on 2026-10-18 05:41
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('home', '0002_gilocation_sellable_quantity'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='gilocation',
+            index=models.Index(fields=['latitude', 'longitude'], name='home_giloca_latitud_53a4a1_idx'),
+        ),
+    ]
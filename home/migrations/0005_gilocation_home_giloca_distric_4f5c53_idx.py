@@ -0,0 +1,19 @@
+# Generated by Django 5.0.7 on 2026-10-18 05:50
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('home', '0004_gilocation_search_vector_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='gilocation',
+            index=models.Index(fields=['district', 'name', 'id'], name='home_giloca_distric_4f5c53_idx'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.0.7 on 2026-10-18 06:37
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('home', '0005_gilocation_home_giloca_distric_4f5c53_idx'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='gilocation',
+            options={'base_manager_name': 'objects', 'ordering': ['district', 'name'], 'verbose_name': 'GI Location', 'verbose_name_plural': 'GI Locations'},
+        ),
+    ]
@@ -1,8 +1,9 @@
 from rest_framework import serializers
+from catalog.serializers import SparseFieldsSerializerMixin
 from .models import GILocation
 
 
-class GILocationSerializer(serializers.ModelSerializer):
+class GILocationSerializer(SparseFieldsSerializerMixin, serializers.ModelSerializer):
     """Serializer for GI Location model"""
 
     created_by_username = serializers.CharField(source='created_by.username', read_only=True)
@@ -17,6 +18,12 @@ class GILocationSerializer(serializers.ModelSerializer):
             'created_at', 'updated_at'
         ]
         read_only_fields = ['created_by', 'created_at', 'updated_at']
+        field_columns = {
+            'image_url': ['image'],
+            'created_by_username': ['created_by__username'],
+        }
+        # With a request in the context, image_url is the absolute image URL
+        fast_aliases = {'image_url': 'image'}
 
     def get_image_url(self, obj):
         request = self.context.get('request')
@@ -3,22 +3,29 @@ from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticatedOrReadOnly, IsAuthenticated
 from django.db.models import Q
+from catalog.grouped import grouped_rows, listing_cache, parse_group_limit
+from catalog.mixins import ConditionalCatalogMixin, FastListMixin, NearbyMixin, SparseFieldsetMixin
+from catalog.search import FullTextSearchFilter
 from .models import GILocation
 from .serializers import GILocationSerializer, GILocationCreateSerializer
 
 
-class GILocationViewSet(viewsets.ModelViewSet):
+class GILocationViewSet(ConditionalCatalogMixin, FastListMixin, SparseFieldsetMixin, NearbyMixin, viewsets.ModelViewSet):
     """
     ViewSet for GI Locations
-    Supports: list, retrieve, create, update, delete
+    Supports: list, retrieve, create, update, delete, nearby
     Filtering: by district, search by name/description
+    Sparse fieldsets: ?fields=id,name,latitude,longitude on list, retrieve and nearby
     """
     queryset = GILocation.objects.all()
     permission_classes = [IsAuthenticatedOrReadOnly]
-    filter_backends = [filters.SearchFilter, filters.OrderingFilter]
+    filter_backends = [filters.OrderingFilter, FullTextSearchFilter]
+    # Covered by the model's search_vector (name > district > description)
     search_fields = ['name', 'description', 'district']
     ordering_fields = ['name', 'district', 'created_at']
     ordering = ['district', 'name']
+    # Keyset pages (?cursor=) follow the default ordering, backed by a composite index
+    cursor_ordering = ['district', 'name', 'id']
     
     def get_serializer_class(self):
         """Use different serializers for different actions"""
@@ -41,7 +48,7 @@ class GILocationViewSet(viewsets.ModelViewSet):
         if district:
             queryset = queryset.filter(district__iexact=district)
         
-        return queryset
+        return self.prune_columns(queryset)
     
     def perform_create(self, serializer):
         """Set the created_by field to the current user"""
@@ -55,12 +62,21 @@ class GILocationViewSet(viewsets.ModelViewSet):
     
     @action(detail=False, methods=['get'])
     def by_district(self, request):
-        """Get GI locations grouped by district"""
-        districts = GILocation.objects.values_list('district', flat=True).distinct()
-        result = {}
+        """
+        Get GI locations grouped by district
+        ?limit=N returns at most N locations (first by name) per district
+        """
+        try:
+            limit = parse_group_limit(request.query_params.get('limit'))
+        except ValueError:
+            return Response({'error': 'limit must be a positive integer'}, status=status.HTTP_400_BAD_REQUEST)
         
-        for district in districts:
-            locations = GILocation.objects.filter(district=district)
-            result[district] = GILocationSerializer(locations, many=True).data
+        def build():
+            columns, related = GILocationSerializer.columns_for(GILocationSerializer.Meta.fields)
+            locations = GILocation.objects.select_related(*related).only(*columns)
+            return {
+                district: GILocationSerializer(rows, many=True).data
+                for district, rows in grouped_rows(locations, 'district', ['name'], limit)
+            }
         
-        return Response(result)
+        return Response(listing_cache.get_or_build(('gi_by_district', limit), build))
@@ -0,0 +1,94 @@
+"""
+Day Clustering
+Partitions a trip's stops into one compact geographic group per day before routing,
+using capacitated k-medoids over the distance matrix. Capacity and demands are
+measured in minutes (visit + travel), so a group roughly fits into one day.
+"""
+from typing import List
+
+import numpy as np
+
+
+MAX_ITERATIONS = 20
+
+
+def _initial_medoids(distances: np.ndarray, from_start: np.ndarray, k: int) -> List[int]:
+    """Farthest-point seeding: start with the stop farthest from the start point"""
+    medoids = [int(np.argmax(from_start))]
+    closest = distances[medoids[0]].copy()
+    while len(medoids) < k:
+        # Exclude chosen medoids so duplicate coordinates cannot be picked twice
+        closest[medoids] = -1
+        nxt = int(np.argmax(closest))
+        medoids.append(nxt)
+        closest = np.minimum(closest, distances[nxt])
+    return medoids
+
+
+def _assign(distances: np.ndarray, medoids: List[int], demands: np.ndarray, capacity: float) -> np.ndarray:
+    """
+    Assign stops to medoids nearest-first within capacity, placing stops with the most
+    to lose (largest regret between best and second-best medoid) first
+    Stops that fit nowhere go to their nearest medoid; the router reinserts them later.
+    """
+    to_medoids = distances[:, medoids]
+    ranked = np.argsort(to_medoids, axis=1, kind='stable')
+    if len(medoids) > 1:
+        sorted_costs = np.take_along_axis(to_medoids, ranked[:, :2], axis=1)
+        regret = sorted_costs[:, 1] - sorted_costs[:, 0]
+    else:
+        regret = np.zeros(len(distances))
+
+    labels = np.full(len(distances), -1)
+    load = np.zeros(len(medoids))
+    for i, medoid in enumerate(medoids):
+        labels[medoid] = i
+        load[i] += demands[medoid]
+
+    for stop in np.argsort(-regret, kind='stable'):
+        if labels[stop] != -1:
+            continue
+        for cluster in ranked[stop]:
+            if load[cluster] + demands[stop] <= capacity:
+                break
+        else:
+            cluster = ranked[stop][0]
+        labels[stop] = cluster
+        load[cluster] += demands[stop]
+    return labels
+
+
+def cluster_stops(distance_matrix: np.ndarray, stops: List[int], demands: np.ndarray,
+                  capacity: float, num_clusters: int) -> List[List[int]]:
+    """
+    Split `stops` (matrix indices, 0 = start point) into `num_clusters` compact groups
+    `demands[i]` is the minutes stops[i] needs and `capacity` the minutes per group.
+    Groups are returned nearest-to-start first; some may be empty.
+    """
+    if num_clusters <= 1 or len(stops) <= 1:
+        return [list(stops)] + [[] for _ in range(num_clusters - 1)]
+    if len(stops) <= num_clusters:
+        return [[s] for s in stops] + [[] for _ in range(num_clusters - len(stops))]
+
+    distances = distance_matrix[np.ix_(stops, stops)]
+    from_start = distance_matrix[0, stops]
+
+    medoids = _initial_medoids(distances, from_start, num_clusters)
+    labels = _assign(distances, medoids, demands, capacity)
+
+    for _ in range(MAX_ITERATIONS):
+        new_medoids = []
+        for cluster in range(num_clusters):
+            members = np.flatnonzero(labels == cluster)
+            if len(members) == 0:
+                new_medoids.append(medoids[cluster])
+                continue
+            within = distances[np.ix_(members, members)].sum(axis=1)
+            new_medoids.append(int(members[np.argmin(within)]))
+        if new_medoids == medoids:
+            break
+        medoids = new_medoids
+        labels = _assign(distances, medoids, demands, capacity)
+
+    order = np.argsort(from_start[medoids], kind='stable')
+    return [[stops[i] for i in np.flatnonzero(labels == cluster)] for cluster in order]
@@ -0,0 +1,71 @@
+"""
+Distance Matrix Engine
+Builds pairwise haversine distance and travel-time matrices in one batched NumPy
+operation so route optimization never recomputes a leg.
+Index 0 of every matrix is the trip start point, index i + 1 is locations[i].
+"""
+from typing import Dict, List
+
+import numpy as np
+
+
+EARTH_RADIUS_KM = 6371
+AVERAGE_SPEED_KMH = 40
+MIN_TRAVEL_MINS = 5
+# Legs shorter than this are treated as walking distance (no travel segment)
+MIN_TRAVEL_DISTANCE_KM = 0.5
+
+
+def build_distance_matrix(points: List[Dict]) -> np.ndarray:
+    """
+    Calculate all pairwise Haversine distances between points
+    Returns an (n, n) float array in kilometers, rounded to 2 decimals
+    """
+    if not points:
+        return np.zeros((0, 0))
+
+    coords = np.radians(np.array(
+        [[float(p['latitude']), float(p['longitude'])] for p in points],
+        dtype=np.float64
+    ))
+    lat = coords[:, 0]
+    lon = coords[:, 1]
+    cos_lat = np.cos(lat)
+
+    dlat = lat[:, None] - lat[None, :]
+    dlon = lon[:, None] - lon[None, :]
+    a = np.sin(dlat / 2) ** 2 + cos_lat[:, None] * cos_lat[None, :] * np.sin(dlon / 2) ** 2
+    c = 2 * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+    return np.round(c * EARTH_RADIUS_KM, 2)
+
+
+def build_travel_time_matrix(distance_matrix: np.ndarray, speed_kmh: float = AVERAGE_SPEED_KMH) -> np.ndarray:
+    """
+    Convert a distance matrix into whole travel minutes
+    Legs under MIN_TRAVEL_DISTANCE_KM cost 0 minutes, all others at least MIN_TRAVEL_MINS
+    """
+    minutes = np.maximum(MIN_TRAVEL_MINS, (distance_matrix / speed_kmh * 60).astype(np.int64))
+    minutes[distance_matrix <= MIN_TRAVEL_DISTANCE_KM] = 0
+    return minutes
+
+
+def distances_from(point: Dict, points: List[Dict]) -> np.ndarray:
+    """
+    Haversine distances from one point to many
+    Returns an (n,) float array in kilometers, matching a build_distance_matrix row
+    """
+    if not points:
+        return np.zeros(0)
+
+    coords = np.radians(np.array(
+        [[float(p['latitude']), float(p['longitude'])] for p in points],
+        dtype=np.float64
+    ))
+    lat0 = np.radians(float(point['latitude']))
+    lon0 = np.radians(float(point['longitude']))
+
+    dlat = lat0 - coords[:, 0]
+    dlon = lon0 - coords[:, 1]
+    a = np.sin(dlat / 2) ** 2 + np.cos(lat0) * np.cos(coords[:, 0]) * np.sin(dlon / 2) ** 2
+    c = 2 * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+    return np.round(c * EARTH_RADIUS_KM, 2)
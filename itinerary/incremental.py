@@ -0,0 +1,149 @@
+"""
+Incremental Schedule Updates
+Applies add_location / remove_location edits to an already saved schedule by
+rewriting only the affected day: an added stop goes to its cheapest feasible
+day and position, a removed stop is spliced out and its day re-timed.
+A full re-solve is used only when the edit cannot be applied in place.
+"""
+from typing import Dict, List, Optional, Tuple
+
+from django.db import transaction
+
+from .models import TripPlan, TripDay, ScheduleItem
+from .persistence import location_to_dict, generate_and_save_schedule, schedule_item_from_dict
+from .schedule_generator import (
+    build_routing_problem, build_day_items, trip_start_point, STRATEGY_LOCAL_SEARCH,
+)
+from .vrptw import best_insertion, DEFAULT_SOLVER_BUDGET_MS
+
+
+UPDATE_INCREMENTAL = 'incremental'
+UPDATE_FULL = 'full'
+
+
+def _load_saved_days(trip_plan) -> Tuple[List[TripDay], List[List[Dict]], List[List[Optional[int]]]]:
+    """
+    Return the trip's saved days and, per day, its visited locations in order
+    and the SelectedLocation id each visit was scheduled for
+    """
+    trip_days = list(TripDay.objects.filter(trip_plan=trip_plan).order_by('day_number'))
+    stops = {day.id: [] for day in trip_days}
+    selections = {day.id: [] for day in trip_days}
+
+    items = (
+        ScheduleItem.objects
+        .filter(trip_day__trip_plan=trip_plan, item_type='location')
+        .select_related('gi_location', 'ad_location')
+        .defer('gi_location__search_vector', 'ad_location__search_vector')
+        .order_by('trip_day_id', 'order')
+    )
+    for item in items:
+        if item.gi_location is not None:
+            stops[item.trip_day_id].append(location_to_dict(item.gi_location, 'gi'))
+        elif item.ad_location is not None:
+            stops[item.trip_day_id].append(location_to_dict(item.ad_location, 'ad'))
+        else:
+            continue
+        selections[item.trip_day_id].append(item.selected_location_id)
+
+    return trip_days, [stops[day.id] for day in trip_days], [selections[day.id] for day in trip_days]
+
+
+def _rewrite_day(trip_plan, trip_day: TripDay, items: List[Dict], selected_ids: List[Optional[int]]) -> None:
+    """
+    Replace one day's schedule items; the saved schedule no longer matches a full solve
+    `selected_ids` are the SelectedLocation ids of the day's visits in route order.
+    """
+    selected = iter(selected_ids)
+    with transaction.atomic():
+        ScheduleItem.objects.filter(trip_day=trip_day).delete()
+        ScheduleItem.objects.bulk_create([
+            schedule_item_from_dict(
+                trip_day, order, item, next(selected) if item['type'] == 'location' else None
+            )
+            for order, item in enumerate(items, start=1)
+        ])
+        TripPlan.objects.filter(pk=trip_plan.pk).update(schedule_fingerprint='')
+        trip_plan.schedule_fingerprint = ''
+
+
+def _full_resolve(trip_plan) -> str:
+    """Re-solve the whole trip with the options its saved schedule was generated with"""
+    generate_and_save_schedule(
+        trip_plan,
+        trip_plan.schedule_strategy or STRATEGY_LOCAL_SEARCH,
+        DEFAULT_SOLVER_BUDGET_MS if trip_plan.schedule_time_budget_ms is None else trip_plan.schedule_time_budget_ms,
+        trip_plan.schedule_starts,
+        trip_plan.schedule_seed
+    )
+    return UPDATE_FULL
+
+
+def _selected(selected_location) -> Tuple[object, str]:
+    """The location a SelectedLocation points at, and its type ('gi' / 'ad')"""
+    if selected_location.gi_location_id:
+        return selected_location.gi_location, 'gi'
+    return selected_location.ad_location, 'ad'
+
+
+def add_stop(trip_plan, selected_location) -> Optional[str]:
+    """
+    Insert a newly created SelectedLocation into the saved schedule
+    Returns 'incremental', 'full' (no feasible slot, trip re-solved) or None (no saved schedule)
+    """
+    trip_days, day_stops, day_selected = _load_saved_days(trip_plan)
+    if not trip_days:
+        return None
+
+    location, location_type = _selected(selected_location)
+    locations = [loc for stops in day_stops for loc in stops]
+    new_location = location_to_dict(location, location_type)
+    problem = build_routing_problem(trip_plan, locations + [new_location])
+
+    routes = []
+    next_index = 1
+    for stops in day_stops:
+        routes.append(list(range(next_index, next_index + len(stops))))
+        next_index += len(stops)
+
+    position = best_insertion(problem, routes, next_index)
+    if position is None:
+        return _full_resolve(trip_plan)
+
+    day_idx, pos = position
+    routes[day_idx].insert(pos, next_index)
+    day_selected[day_idx].insert(pos, selected_location.id)
+    points = [trip_start_point(trip_plan)] + locations + [new_location]
+    _rewrite_day(
+        trip_plan, trip_days[day_idx],
+        build_day_items(problem, routes[day_idx], points), day_selected[day_idx]
+    )
+    return UPDATE_INCREMENTAL
+
+
+def remove_stop(trip_plan, selected_location) -> Optional[str]:
+    """
+    Delete a SelectedLocation and splice its visit out of the saved schedule, re-timing that day
+    Returns 'incremental', 'full' (day became infeasible, trip re-solved) or None
+    (no saved schedule, or the selection was not scheduled)
+    """
+    selected_id = selected_location.id
+    trip_days, day_stops, day_selected = _load_saved_days(trip_plan)
+    selected_location.delete()
+
+    for day_idx, selected_ids in enumerate(day_selected):
+        if selected_id not in selected_ids:
+            continue
+        pos = selected_ids.index(selected_id)
+        remaining = day_stops[day_idx][:pos] + day_stops[day_idx][pos + 1:]
+        remaining_ids = selected_ids[:pos] + selected_ids[pos + 1:]
+        problem = build_routing_problem(trip_plan, remaining)
+        route = list(range(1, len(remaining) + 1))
+        if problem.simulate(route) is None:
+            return _full_resolve(trip_plan)
+
+        points = [trip_start_point(trip_plan)] + remaining
+        _rewrite_day(trip_plan, trip_days[day_idx], build_day_items(problem, route, points), remaining_ids)
+        return UPDATE_INCREMENTAL
+
+    return None
@@ -0,0 +1,106 @@
+"""
+Schedule Generation Jobs
+DB-backed queue that moves schedule generation off the request path.
+The API enqueues ScheduleJob rows; the run_schedule_worker command claims and runs them.
+"""
+import logging
+from datetime import timedelta
+from typing import List
+
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+
+from .models import ScheduleJob
+from .persistence import generate_and_save_schedule
+
+
+logger = logging.getLogger(__name__)
+
+# Running jobs older than this are assumed to belong to a dead worker
+STALE_JOB_MINUTES = 10
+
+
+def enqueue_schedule_job(trip_plan, strategy: str, time_budget_ms: int,
+                         starts: int = 1, seed: int = 0) -> ScheduleJob:
+    """Queue schedule generation for a trip, reusing a job that is still pending"""
+    job = ScheduleJob.objects.filter(
+        trip_plan=trip_plan,
+        status=ScheduleJob.STATUS_PENDING,
+        strategy=strategy,
+        time_budget_ms=time_budget_ms,
+        starts=starts,
+        seed=seed,
+    ).first()
+    if job is None:
+        job = ScheduleJob.objects.create(
+            trip_plan=trip_plan,
+            strategy=strategy,
+            time_budget_ms=time_budget_ms,
+            starts=starts,
+            seed=seed,
+        )
+    return job
+
+
+def claim_jobs(limit: int) -> List[int]:
+    """
+    Atomically mark up to `limit` pending jobs as running and return their ids
+    SKIP LOCKED lets several workers poll the same table without double-claiming.
+    """
+    if limit <= 0:
+        return []
+    with transaction.atomic():
+        job_ids = list(
+            ScheduleJob.objects
+            .select_for_update(skip_locked=True)
+            .filter(status=ScheduleJob.STATUS_PENDING)
+            .order_by('created_at')
+            .values_list('id', flat=True)[:limit]
+        )
+        if job_ids:
+            ScheduleJob.objects.filter(id__in=job_ids).update(
+                status=ScheduleJob.STATUS_RUNNING,
+                started_at=timezone.now()
+            )
+    return job_ids
+
+
+def requeue_stale_jobs() -> int:
+    """Put jobs left running by a crashed worker back into the queue"""
+    cutoff = timezone.now() - timedelta(minutes=STALE_JOB_MINUTES)
+    return ScheduleJob.objects.filter(
+        status=ScheduleJob.STATUS_RUNNING,
+        started_at__lt=cutoff
+    ).update(status=ScheduleJob.STATUS_PENDING, started_at=None)
+
+
+def release_jobs(job_ids) -> int:
+    """Put claimed jobs that never started back into the queue"""
+    if not job_ids:
+        return 0
+    return ScheduleJob.objects.filter(
+        id__in=list(job_ids),
+        status=ScheduleJob.STATUS_RUNNING
+    ).update(status=ScheduleJob.STATUS_PENDING, started_at=None)
+
+
+def run_schedule_job(job_id: int) -> None:
+    """Generate and save the schedule for one claimed job, recording the outcome"""
+    close_old_connections()
+    try:
+        job = ScheduleJob.objects.select_related('trip_plan').get(id=job_id)
+        try:
+            schedule = generate_and_save_schedule(
+                job.trip_plan, job.strategy, job.time_budget_ms, job.starts, job.seed
+            )
+        except Exception as e:
+            logger.exception("Schedule job %s failed", job_id)
+            job.status = ScheduleJob.STATUS_FAILED
+            job.error = str(e)
+        else:
+            job.status = ScheduleJob.STATUS_COMPLETED
+            job.result = schedule
+        job.finished_at = timezone.now()
+        job.save(update_fields=['status', 'result', 'error', 'finished_at'])
+    finally:
+        close_old_connections()
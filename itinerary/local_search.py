@@ -0,0 +1,124 @@
+"""
+Local Search Route Refinement
+Improves an open route (fixed start, no return leg) with 2-opt and Or-opt moves.
+Every move is evaluated with an O(1) delta against a precomputed distance matrix,
+and the search stops at a hard wall-clock deadline.
+"""
+import time
+from typing import List, Optional
+
+import numpy as np
+
+
+DEFAULT_TIME_BUDGET_MS = 200
+OR_OPT_MAX_SEGMENT = 3
+# Ignore float noise when comparing deltas
+EPSILON = 1e-9
+
+
+def route_cost(distance_matrix: np.ndarray, route: List[int]) -> float:
+    """Total cost of an open route given as matrix indices (route[0] is the start)"""
+    if len(route) < 2:
+        return 0.0
+    return float(distance_matrix[route[:-1], route[1:]].sum())
+
+
+def _two_opt_pass(d: List[List[float]], route: List[int], deadline: float) -> bool:
+    """Apply improving 2-opt moves (segment reversals); returns True if the route changed"""
+    improved = False
+    last = len(route) - 1
+
+    for i in range(1, last):
+        if time.perf_counter() >= deadline:
+            break
+        a = route[i - 1]
+        for j in range(i + 1, last + 1):
+            b, c = route[i], route[j]
+            delta = d[a][c] - d[a][b]
+            if j < last:
+                e = route[j + 1]
+                delta += d[b][e] - d[c][e]
+            if delta < -EPSILON:
+                route[i:j + 1] = route[i:j + 1][::-1]
+                improved = True
+
+    return improved
+
+
+def _or_opt_pass(d: List[List[float]], route: List[int], deadline: float) -> bool:
+    """Apply improving Or-opt moves (relocate a 1-3 stop segment, optionally reversed)"""
+    improved = False
+
+    for seg_len in range(1, OR_OPT_MAX_SEGMENT + 1):
+        i = 1
+        while i + seg_len <= len(route):
+            if time.perf_counter() >= deadline:
+                return improved
+
+            last = len(route) - 1
+            j = i + seg_len - 1
+            prev, first, end = route[i - 1], route[i], route[j]
+            nxt = route[j + 1] if j < last else None
+
+            removal_gain = d[prev][first] + (d[end][nxt] - d[prev][nxt] if nxt is not None else 0.0)
+
+            best_delta = -EPSILON
+            best_move = None
+            for k in range(len(route)):
+                # Insert between route[k] and route[k + 1]; skip positions touching the segment
+                if i - 1 <= k <= j:
+                    continue
+                u = route[k]
+                v = route[k + 1] if k < last else None
+                base = -d[u][v] if v is not None else 0.0
+                forward = base + d[u][first] + (d[end][v] if v is not None else 0.0)
+                backward = base + d[u][end] + (d[first][v] if v is not None else 0.0)
+                for delta, reverse in ((forward, False), (backward, True)):
+                    delta -= removal_gain
+                    if delta < best_delta:
+                        best_delta = delta
+                        best_move = (k, reverse)
+
+            if best_move is None:
+                i += 1
+                continue
+
+            k, reverse = best_move
+            segment = route[i:j + 1]
+            if reverse:
+                segment.reverse()
+            del route[i:j + 1]
+            insert_at = k + 1 if k < i else k + 1 - seg_len
+            route[insert_at:insert_at] = segment
+            improved = True
+
+    return improved
+
+
+def improve_route(distance_matrix: np.ndarray, route: List[int],
+                  time_budget_ms: Optional[float] = DEFAULT_TIME_BUDGET_MS,
+                  deadline: Optional[float] = None) -> List[int]:
+    """
+    Refine an open route with alternating 2-opt and Or-opt passes
+    `route` holds matrix indices and route[0] stays fixed as the start.
+    Stops when no move improves the route or the deadline (perf_counter seconds,
+    or now + time_budget_ms) is reached; the best route found so far is returned.
+    """
+    route = list(route)
+    if len(route) < 3:
+        return route
+
+    if deadline is None:
+        budget = time_budget_ms if time_budget_ms is not None else DEFAULT_TIME_BUDGET_MS
+        deadline = time.perf_counter() + budget / 1000.0
+
+    # Plain nested lists are much faster than numpy scalar indexing in tight loops
+    d = distance_matrix.tolist()
+
+    while time.perf_counter() < deadline:
+        changed = _two_opt_pass(d, route, deadline)
+        changed = _or_opt_pass(d, route, deadline) or changed
+        if not changed:
+            break
+
+    return route
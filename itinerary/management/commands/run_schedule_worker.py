@@ -0,0 +1,84 @@
+import signal
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from contextlib import contextmanager
+
+from django.core.management.base import BaseCommand
+
+from itinerary.jobs import claim_jobs, release_jobs, requeue_stale_jobs, run_schedule_job
+
+
+@contextmanager
+def interrupts_deferred():
+    """Hold back Ctrl-C until the block is done, so claimed jobs are always handed to the pool"""
+    received = []
+    previous = signal.signal(signal.SIGINT, lambda signum, frame: received.append(signum))
+    try:
+        yield
+    finally:
+        signal.signal(signal.SIGINT, previous)
+    if received:
+        raise KeyboardInterrupt
+
+
+class Command(BaseCommand):
+    help = 'Run queued schedule generation jobs off the request path'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=2, help='Number of jobs to run concurrently')
+        parser.add_argument('--poll-interval', type=float, default=1.0, help='Seconds to wait when the queue is empty')
+        parser.add_argument('--once', action='store_true', help='Drain the current queue and exit')
+        parser.add_argument('--sweep-interval', type=float, default=60.0,
+                            help='Seconds between requeues of jobs left running by a dead worker')
+
+    def handle(self, *args, **options):
+        workers = max(1, options['workers'])
+        poll_interval = options['poll_interval']
+        sweep_interval = options['sweep_interval']
+
+        self.stdout.write(f'Schedule worker started with {workers} worker(s)')
+
+        running = set()
+        # Claimed (marked running) but not yet picked up by a pool thread
+        unstarted = set()
+
+        def start(job_id):
+            unstarted.discard(job_id)
+            run_schedule_job(job_id)
+
+        next_sweep = 0.0
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='schedule-job') as pool:
+            try:
+                while True:
+                    # Other workers may die at any time, not only before this one starts
+                    if time.monotonic() >= next_sweep:
+                        self.requeue_stale()
+                        next_sweep = time.monotonic() + sweep_interval
+
+                    with interrupts_deferred():
+                        job_ids = claim_jobs(workers - len(running))
+                        unstarted.update(job_ids)
+                        for job_id in job_ids:
+                            running.add(pool.submit(start, job_id))
+
+                    if not running:
+                        if options['once']:
+                            break
+                        time.sleep(poll_interval)
+                        continue
+
+                    _, running = wait(running, timeout=poll_interval, return_when=FIRST_COMPLETED)
+                    running = set(running)
+            except KeyboardInterrupt:
+                self.stdout.write('Stopping schedule worker, waiting for running jobs...')
+                pool.shutdown(wait=False, cancel_futures=True)
+
+        released = release_jobs(unstarted)
+        if released:
+            self.stdout.write(self.style.WARNING(f'Requeued {released} job(s) that had not started'))
+        self.stdout.write(self.style.SUCCESS('Schedule worker stopped'))
+
+    def requeue_stale(self):
+        requeued = requeue_stale_jobs()
+        if requeued:
+            self.stdout.write(self.style.WARNING(f'Requeued {requeued} stale job(s)'))
@@ -0,0 +1,32 @@
+# Generated by Django 5.0.7 on 2026-10-18 05:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('itinerary', '0002_alter_tripplan_user'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TravelLeg',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('from_key', models.CharField(max_length=32)),
+                ('to_key', models.CharField(max_length=32)),
+                ('distance_km', models.DecimalField(decimal_places=2, max_digits=8)),
+                ('duration_minutes', models.IntegerField()),
+                ('source', models.CharField(choices=[('haversine', 'Haversine estimate')], default='haversine', max_length=20)),
+                ('version', models.IntegerField(default=1)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'Travel Leg',
+                'verbose_name_plural': 'Travel Legs',
+                'indexes': [models.Index(fields=['to_key'], name='itinerary_t_to_key_3ea6cd_idx')],
+                'unique_together': {('from_key', 'to_key', 'source', 'version')},
+            },
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.0.7 on 2026-10-18 05:30
+
+import django.core.serializers.json
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('itinerary', '0003_travelleg'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ScheduleJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('running', 'Running'), ('completed', 'Completed'), ('failed', 'Failed')], default='pending', max_length=20)),
+                ('strategy', models.CharField(max_length=30)),
+                ('time_budget_ms', models.IntegerField()),
+                ('result', models.JSONField(blank=True, encoder=django.core.serializers.json.DjangoJSONEncoder, null=True)),
+                ('error', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('trip_plan', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='schedule_jobs', to='itinerary.tripplan')),
+            ],
+            options={
+                'verbose_name': 'Schedule Job',
+                'verbose_name_plural': 'Schedule Jobs',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['status', 'created_at'], name='itinerary_s_status_9f1687_idx')],
+            },
+        ),
+    ]
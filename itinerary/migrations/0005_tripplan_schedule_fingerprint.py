@@ -0,0 +1,18 @@
+# Generated by Django 5.0.7 on 2026-10-18 05:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('itinerary', '0004_schedulejob'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tripplan',
+            name='schedule_fingerprint',
+            field=models.CharField(blank=True, editable=False, help_text='Fingerprint of the inputs the saved schedule was generated from', max_length=64),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.0.7 on 2026-10-18 05:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('itinerary', '0005_tripplan_schedule_fingerprint'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='schedulejob',
+            name='seed',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='schedulejob',
+            name='starts',
+            field=models.PositiveSmallIntegerField(default=1),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.0.7 on 2026-10-18 05:50
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('itinerary', '0006_schedulejob_starts_seed'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='tripplan',
+            index=models.Index(fields=['user', 'created_at', 'id'], name='itinerary_t_user_id_847ff0_idx'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.0.7 on 2026-10-18 06:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('itinerary', '0007_tripplan_itinerary_t_user_id_847ff0_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='travelleg',
+            name='from_position',
+            field=models.CharField(default='', max_length=32),
+        ),
+        migrations.AddField(
+            model_name='travelleg',
+            name='to_position',
+            field=models.CharField(default='', max_length=32),
+        ),
+    ]
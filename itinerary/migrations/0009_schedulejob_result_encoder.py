@@ -0,0 +1,19 @@
+# Generated by Django 5.0.7 on 2026-10-18 06:09
+
+import rest_framework.utils.encoders
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('itinerary', '0008_travelleg_positions'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='schedulejob',
+            name='result',
+            field=models.JSONField(blank=True, encoder=rest_framework.utils.encoders.JSONEncoder, null=True),
+        ),
+    ]
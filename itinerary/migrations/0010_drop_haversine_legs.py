@@ -0,0 +1,20 @@
+# Generated by Django 5.0.7 on 2026-10-18 06:21
+
+from django.db import migrations
+
+
+def drop_haversine_legs(apps, schema_editor):
+    """Haversine legs are recomputed per trip now; the stored copies are never read"""
+    TravelLeg = apps.get_model('itinerary', 'TravelLeg')
+    TravelLeg.objects.filter(source='haversine').delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('itinerary', '0009_schedulejob_result_encoder'),
+    ]
+
+    operations = [
+        migrations.RunPython(drop_haversine_legs, migrations.RunPython.noop),
+    ]
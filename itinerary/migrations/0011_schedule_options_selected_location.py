@@ -0,0 +1,67 @@
+# Generated by Django 5.0.7 on 2026-10-18 06:35
+
+import django.db.models.deletion
+from collections import defaultdict, deque
+
+from django.db import migrations, models
+
+
+def link_schedule_items(apps, schema_editor):
+    """Point saved location visits at their selection; the n-th visit of a location takes its n-th selection"""
+    SelectedLocation = apps.get_model('itinerary', 'SelectedLocation')
+    ScheduleItem = apps.get_model('itinerary', 'ScheduleItem')
+
+    selections = defaultdict(deque)
+    for pk, trip_id, gi_id, ad_id in (
+        SelectedLocation.objects.order_by('trip_plan_id', 'added_at', 'id')
+        .values_list('id', 'trip_plan_id', 'gi_location_id', 'ad_location_id')
+    ):
+        selections[trip_id, 'gi' if gi_id else 'ad', gi_id or ad_id].append(pk)
+
+    items = (
+        ScheduleItem.objects.filter(item_type='location')
+        .order_by('trip_day__trip_plan_id', 'trip_day__day_number', 'order')
+        .values_list('id', 'trip_day__trip_plan_id', 'gi_location_id', 'ad_location_id')
+    )
+    linked = []
+    for pk, trip_id, gi_id, ad_id in items:
+        queue = selections[trip_id, 'gi' if gi_id else 'ad', gi_id or ad_id]
+        if queue:
+            linked.append(ScheduleItem(id=pk, selected_location_id=queue.popleft()))
+    ScheduleItem.objects.bulk_update(linked, ['selected_location'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('itinerary', '0010_drop_haversine_legs'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='scheduleitem',
+            name='selected_location',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='schedule_items', to='itinerary.selectedlocation'),
+        ),
+        migrations.AddField(
+            model_name='tripplan',
+            name='schedule_seed',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='tripplan',
+            name='schedule_starts',
+            field=models.PositiveSmallIntegerField(default=1, editable=False),
+        ),
+        migrations.AddField(
+            model_name='tripplan',
+            name='schedule_strategy',
+            field=models.CharField(blank=True, editable=False, max_length=30),
+        ),
+        migrations.AddField(
+            model_name='tripplan',
+            name='schedule_time_budget_ms',
+            field=models.IntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.RunPython(link_schedule_items, migrations.RunPython.noop),
+    ]
@@ -1,5 +1,6 @@
 from django.db import models
 from django.contrib.auth.models import User
+from rest_framework.utils.encoders import JSONEncoder
 from home.models import GILocation
 from adver.models import AdLocation
 
@@ -17,6 +18,17 @@ class TripPlan(models.Model):
     end_time = models.TimeField()
     num_days = models.IntegerField(default=1)
     available_hours_per_day = models.IntegerField(default=8)
+    schedule_fingerprint = models.CharField(
+        max_length=64,
+        blank=True,
+        editable=False,
+        help_text="Fingerprint of the inputs the saved schedule was generated from"
+    )
+    # Solver options the saved schedule was generated with, reused when an edit needs a full re-solve
+    schedule_strategy = models.CharField(max_length=30, blank=True, editable=False)
+    schedule_time_budget_ms = models.IntegerField(null=True, blank=True, editable=False)
+    schedule_starts = models.PositiveSmallIntegerField(default=1, editable=False)
+    schedule_seed = models.IntegerField(default=0, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
@@ -24,6 +36,10 @@ class TripPlan(models.Model):
         ordering = ['-created_at']
         verbose_name = 'Trip Plan'
         verbose_name_plural = 'Trip Plans'
+        indexes = [
+            # A user's trips newest first, for keyset pagination
+            models.Index(fields=['user', 'created_at', 'id']),
+        ]
     
     def __str__(self):
         return f"{self.title}"
@@ -60,6 +76,10 @@ class ScheduleItem(models.Model):
     item_type = models.CharField(max_length=20, choices=ITEM_TYPE_CHOICES)
     gi_location = models.ForeignKey(GILocation, on_delete=models.SET_NULL, null=True, blank=True)
     ad_location = models.ForeignKey(AdLocation, on_delete=models.SET_NULL, null=True, blank=True)
+    # The trip selection a location visit was scheduled for (a location can be selected twice)
+    selected_location = models.ForeignKey(
+        'SelectedLocation', on_delete=models.SET_NULL, null=True, blank=True, related_name='schedule_items'
+    )
     start_time = models.TimeField()
     end_time = models.TimeField()
     duration_minutes = models.IntegerField()
@@ -91,3 +111,78 @@ class SelectedLocation(models.Model):
     def __str__(self):
         location = self.gi_location if self.gi_location else self.ad_location
         return f"{self.trip_plan.title} - {location.name}"
+
+
+class TravelLeg(models.Model):
+    """
+    Stored travel distance/time between two locations, for sources that are
+    expensive to compute; haversine estimates are recomputed instead (see travel_cache.py)
+    Stored once per unordered pair (from_key < to_key), keys look like 'gi:12' / 'ad:3'
+    The endpoint positions the leg was computed from are kept so a leg written
+    for a location's old coordinates is never served after it moves.
+    """
+    
+    SOURCE_HAVERSINE = 'haversine'
+    SOURCE_CHOICES = [
+        (SOURCE_HAVERSINE, 'Haversine estimate'),
+    ]
+    
+    from_key = models.CharField(max_length=32)
+    to_key = models.CharField(max_length=32)
+    distance_km = models.DecimalField(max_digits=8, decimal_places=2)
+    duration_minutes = models.IntegerField()
+    from_position = models.CharField(max_length=32, default='')
+    to_position = models.CharField(max_length=32, default='')
+    source = models.CharField(max_length=20, choices=SOURCE_CHOICES, default=SOURCE_HAVERSINE)
+    version = models.IntegerField(default=1)
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        verbose_name = 'Travel Leg'
+        verbose_name_plural = 'Travel Legs'
+        unique_together = ['from_key', 'to_key', 'source', 'version']
+        indexes = [
+            models.Index(fields=['to_key']),
+        ]
+    
+    def __str__(self):
+        return f"{self.from_key} -> {self.to_key} ({self.distance_km} km)"
+
+
+class ScheduleJob(models.Model):
+    """Background schedule generation request, executed by the run_schedule_worker command"""
+    
+    STATUS_PENDING = 'pending'
+    STATUS_RUNNING = 'running'
+    STATUS_COMPLETED = 'completed'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = [
+        (STATUS_PENDING, 'Pending'),
+        (STATUS_RUNNING, 'Running'),
+        (STATUS_COMPLETED, 'Completed'),
+        (STATUS_FAILED, 'Failed'),
+    ]
+    
+    trip_plan = models.ForeignKey(TripPlan, on_delete=models.CASCADE, related_name='schedule_jobs')
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=STATUS_PENDING)
+    strategy = models.CharField(max_length=30)
+    time_budget_ms = models.IntegerField()
+    starts = models.PositiveSmallIntegerField(default=1)
+    seed = models.IntegerField(default=0)
+    # Encoded like the API renders the synchronous response (Decimal -> float, ...)
+    result = models.JSONField(null=True, blank=True, encoder=JSONEncoder)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        ordering = ['-created_at']
+        verbose_name = 'Schedule Job'
+        verbose_name_plural = 'Schedule Jobs'
+        indexes = [
+            models.Index(fields=['status', 'created_at']),
+        ]
+    
+    def __str__(self):
+        return f"{self.trip_plan.title} - {self.status} (Job {self.id})"
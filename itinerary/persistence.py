@@ -0,0 +1,152 @@
+"""
+Schedule Persistence
+Loads a trip's selected locations for the schedule generator and writes generated
+schedules back into TripDay / ScheduleItem rows.
+"""
+from collections import defaultdict, deque
+from datetime import date, time
+from typing import Any, Dict, List, Optional
+
+from django.db import transaction
+
+from .models import TripPlan, TripDay, ScheduleItem, SelectedLocation
+from .schedule_cache import get_or_generate_schedule
+
+
+def location_to_dict(location, location_type: str) -> Dict[str, Any]:
+    """Convert a GILocation / AdLocation into the dict consumed by the schedule generator"""
+    return {
+        'id': location.id,
+        'type': location_type,
+        'name': location.name,
+        'district': location.district,
+        'latitude': location.latitude,
+        'longitude': location.longitude,
+        'opening_time': location.opening_time,
+        'closing_time': location.closing_time,
+        'typical_visit_duration': getattr(location, 'typical_visit_duration', 60),
+        'updated_at': location.updated_at,
+    }
+
+
+def load_trip_locations(trip_plan) -> List[Dict[str, Any]]:
+    """Load all selected locations of a trip in a single query"""
+    selected = (
+        SelectedLocation.objects
+        .filter(trip_plan=trip_plan)
+        .select_related('gi_location', 'ad_location')
+        .defer('gi_location__search_vector', 'ad_location__search_vector')
+        .order_by('added_at', 'id')
+    )
+    locations = []
+    for item in selected:
+        if item.gi_location is not None:
+            locations.append(location_to_dict(item.gi_location, 'gi'))
+        elif item.ad_location is not None:
+            locations.append(location_to_dict(item.ad_location, 'ad'))
+    return locations
+
+
+def schedule_item_from_dict(trip_day: TripDay, order: int, item: Dict[str, Any],
+                            selected_location_id: Optional[int] = None) -> ScheduleItem:
+    """Build an unsaved ScheduleItem from a generated schedule item dict"""
+    schedule_item = ScheduleItem(
+        trip_day=trip_day,
+        item_type=item['type'],
+        start_time=time.fromisoformat(item['start_time']),
+        end_time=time.fromisoformat(item['end_time']),
+        duration_minutes=item['duration'],
+        order=order,
+    )
+    if item['type'] == 'travel':
+        schedule_item.distance_km = item['distance']
+    elif item['type'] == 'break':
+        schedule_item.notes = item.get('name', '')
+    elif item['type'] == 'location':
+        schedule_item.selected_location_id = selected_location_id
+        if item.get('location_type') == 'ad':
+            schedule_item.ad_location_id = item['location_id']
+        else:
+            schedule_item.gi_location_id = item['location_id']
+    return schedule_item
+
+
+def link_selected_locations(trip_plan, schedule_items: List[ScheduleItem]) -> None:
+    """
+    Point each location visit at the trip selection it was scheduled for
+    The n-th visit of a location takes its n-th selection (by added_at), so a
+    location selected twice keeps one visit per selection.
+    """
+    selections = defaultdict(deque)
+    for pk, gi_id, ad_id in (
+        SelectedLocation.objects.filter(trip_plan=trip_plan)
+        .order_by('added_at', 'id')
+        .values_list('id', 'gi_location_id', 'ad_location_id')
+    ):
+        selections['gi' if gi_id else 'ad', gi_id or ad_id].append(pk)
+
+    for item in schedule_items:
+        if item.item_type == 'location':
+            queue = selections['gi' if item.gi_location_id else 'ad', item.gi_location_id or item.ad_location_id]
+            if queue:
+                item.selected_location_id = queue.popleft()
+
+
+def save_schedule(trip_plan, schedule: Dict[str, Any], fingerprint: str = '',
+                  options: Optional[Dict[str, Any]] = None) -> List[TripDay]:
+    """
+    Replace a trip's days and schedule items with a generated schedule
+    Runs in one transaction with one bulk INSERT for days and one for items.
+    `fingerprint` records which inputs the saved schedule was generated from, and
+    `options` the solver options (strategy, time_budget_ms, starts, seed) it used.
+    """
+    fields = {'schedule_fingerprint': fingerprint}
+    if options is not None:
+        fields.update({
+            'schedule_strategy': options['strategy'],
+            'schedule_time_budget_ms': options['time_budget_ms'],
+            'schedule_starts': options['starts'],
+            'schedule_seed': options['seed'],
+        })
+    with transaction.atomic():
+        # update() leaves updated_at alone, so saving does not change the trip fingerprint
+        TripPlan.objects.filter(pk=trip_plan.pk).update(**fields)
+        for name, value in fields.items():
+            setattr(trip_plan, name, value)
+
+        TripDay.objects.filter(trip_plan=trip_plan).delete()
+
+        trip_days = TripDay.objects.bulk_create([
+            TripDay(
+                trip_plan=trip_plan,
+                day_number=day['day_number'],
+                date=date.fromisoformat(day['date'])
+            )
+            for day in schedule['days']
+        ])
+
+        schedule_items = [
+            schedule_item_from_dict(trip_day, order, item)
+            for trip_day, day in zip(trip_days, schedule['days'])
+            for order, item in enumerate(day['items'], start=1)
+        ]
+        link_selected_locations(trip_plan, schedule_items)
+        ScheduleItem.objects.bulk_create(schedule_items)
+
+    return trip_days
+
+
+def generate_and_save_schedule(trip_plan, strategy: str, time_budget_ms: float,
+                               starts: int = 1, seed: int = 0) -> Dict[str, Any]:
+    """
+    Generate (or fetch from the result cache) a trip's schedule and persist it
+    Writes are skipped when a cached schedule for identical inputs is already saved.
+    """
+    locations = load_trip_locations(trip_plan)
+    schedule, fingerprint, cache_hit = get_or_generate_schedule(
+        trip_plan, locations, strategy, time_budget_ms, starts, seed
+    )
+    if not cache_hit or trip_plan.schedule_fingerprint != fingerprint:
+        options = {'strategy': strategy, 'time_budget_ms': time_budget_ms, 'starts': starts, 'seed': seed}
+        save_schedule(trip_plan, schedule, fingerprint, options)
+    return schedule
@@ -0,0 +1,115 @@
+"""
+Schedule Result Cache
+Memoizes generate_optimized_schedule per process, keyed by a fingerprint of every
+input that affects the result. Any change to the trip or a selected location changes
+its updated_at and therefore the key, so stale entries are never served; they simply
+age out of the LRU.
+"""
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+
+from .schedule_generator import generate_optimized_schedule
+from .travel_cache import TRAVEL_LEG_VERSION
+
+
+class LRUScheduleCache:
+    """Thread-safe LRU of generated schedules capped by entry count and total JSON size"""
+
+    def __init__(self, max_entries: int, max_bytes: int):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            self._entries.move_to_end(key)
+            return entry[0]
+
+    def set(self, key: str, schedule: Dict[str, Any]) -> None:
+        size = len(json.dumps(schedule, cls=DjangoJSONEncoder))
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old[1]
+            self._entries[key] = (schedule, size)
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+schedule_cache = LRUScheduleCache(
+    max_entries=getattr(settings, 'ITINERARY_SCHEDULE_CACHE_MAX_ENTRIES', 256),
+    max_bytes=getattr(settings, 'ITINERARY_SCHEDULE_CACHE_MAX_BYTES', 32 * 1024 * 1024),
+)
+
+
+def trip_fingerprint(trip_plan, locations: List[Dict], strategy: str, time_budget_ms: float,
+                     starts: int = 1, seed: int = 0) -> str:
+    """Canonical hash of everything that determines a trip's generated schedule"""
+    payload = [
+        trip_plan.id,
+        str(trip_plan.start_latitude),
+        str(trip_plan.start_longitude),
+        trip_plan.start_date.isoformat(),
+        trip_plan.start_time.isoformat(),
+        trip_plan.end_time.isoformat(),
+        trip_plan.num_days,
+        trip_plan.updated_at.isoformat() if trip_plan.updated_at else None,
+        strategy,
+        time_budget_ms,
+        starts,
+        seed,
+        TRAVEL_LEG_VERSION,
+        sorted(
+            (loc.get('type') or '', loc.get('id') or 0,
+             loc['updated_at'].isoformat() if loc.get('updated_at') else '')
+            for loc in locations
+        ),
+    ]
+    encoded = json.dumps(payload, separators=(',', ':')).encode()
+    return hashlib.sha256(encoded).hexdigest()
+
+
+def get_or_generate_schedule(trip_plan, locations: List[Dict], strategy: str,
+                             time_budget_ms: float, starts: int = 1,
+                             seed: int = 0) -> Tuple[Dict[str, Any], str, bool]:
+    """
+    Return (schedule, fingerprint, cache_hit), generating the schedule only on a miss
+    Cached schedules are shared between callers and must not be mutated.
+    """
+    fingerprint = trip_fingerprint(trip_plan, locations, strategy, time_budget_ms, starts, seed)
+    schedule = schedule_cache.get(fingerprint)
+    if schedule is not None:
+        return schedule, fingerprint, True
+
+    schedule = generate_optimized_schedule(
+        trip_plan, locations,
+        strategy=strategy,
+        time_budget_ms=time_budget_ms,
+        starts=starts,
+        seed=seed
+    )
+    schedule_cache.set(fingerprint, schedule)
+    return schedule, fingerprint, False
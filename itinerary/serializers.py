@@ -1,5 +1,5 @@
 from rest_framework import serializers
-from .models import TripPlan, TripDay, ScheduleItem, SelectedLocation
+from .models import TripPlan, TripDay, ScheduleItem, SelectedLocation, ScheduleJob
 from home.serializers import GILocationListSerializer
 from adver.serializers import AdLocationListSerializer
 
@@ -43,6 +43,18 @@ class SelectedLocationSerializer(serializers.ModelSerializer):
         fields = ['id', 'gi_location', 'ad_location', 'gi_location_id', 'ad_location_id', 'added_at']
 
 
+class ScheduleJobSerializer(serializers.ModelSerializer):
+    """Serializer for background schedule generation jobs"""
+    
+    class Meta:
+        model = ScheduleJob
+        fields = [
+            'id', 'trip_plan', 'status', 'strategy', 'time_budget_ms', 'starts', 'seed',
+            'result', 'error', 'created_at', 'started_at', 'finished_at'
+        ]
+        read_only_fields = fields
+
+
 class TripPlanSerializer(serializers.ModelSerializer):
     """Serializer for Trip Plans"""
     
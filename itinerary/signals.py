@@ -0,0 +1,55 @@
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+
+from home.models import GILocation
+from adver.models import AdLocation
+from .travel_cache import invalidate_location_legs
+
+
+LOCATION_TYPES = {
+    GILocation: 'gi',
+    AdLocation: 'ad',
+}
+
+
+def _stored_legs_enabled() -> bool:
+    return getattr(settings, 'ITINERARY_STORED_TRAVEL_LEGS', False)
+
+
+@receiver(pre_save, sender=GILocation)
+@receiver(pre_save, sender=AdLocation)
+def remember_leg_position(sender, instance, **kwargs):
+    """Keep the stored coordinates so post_save can tell whether the location moved"""
+    instance._leg_position = None
+    if instance.pk is None or not _stored_legs_enabled():
+        return
+    instance._leg_position = (
+        sender.objects.filter(pk=instance.pk).values_list('latitude', 'longitude').first()
+    )
+
+
+@receiver(post_save, sender=GILocation)
+@receiver(post_save, sender=AdLocation)
+def invalidate_legs_on_move(sender, instance, created, **kwargs):
+    """
+    Drop stored travel legs once a move is committed
+    Legs also record the coordinates they were computed from, so ones written
+    concurrently with the old coordinates are never used even if they outlive this.
+    """
+    old = getattr(instance, '_leg_position', None)
+    if created or old is None:
+        return
+    if (Decimal(str(instance.latitude)), Decimal(str(instance.longitude))) != old:
+        key = f"{LOCATION_TYPES[sender]}:{instance.pk}"
+        transaction.on_commit(lambda: invalidate_location_legs(key))
+
+
+@receiver(post_delete, sender=GILocation)
+@receiver(post_delete, sender=AdLocation)
+def invalidate_legs_on_delete(sender, instance, **kwargs):
+    """Drop stored travel legs of a deleted location"""
+    invalidate_location_legs(f"{LOCATION_TYPES[sender]}:{instance.pk}")
@@ -0,0 +1,99 @@
+"""
+Solver Process Pool
+One ProcessPoolExecutor per server process, created on first use and reused across
+requests, for refining the days of long trips concurrently. Workers are spawned
+(not forked) and only import the pure solver modules, so they hold no Django or
+database state. Disabled when ITINERARY_SOLVER_WORKERS is 0.
+"""
+import multiprocessing
+import threading
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Optional
+
+from django.conf import settings
+
+
+# Trips with fewer days are refined serially; pool overhead outweighs the gain
+PARALLEL_MIN_DAYS = 3
+
+
+def _warm_up() -> None:
+    """Import the solver in a fresh worker so the first real task does not pay for it"""
+    from . import vrptw  # noqa: F401
+
+
+class SolverPool(Executor):
+    """
+    A ProcessPoolExecutor that replaces itself once broken
+    A crashed worker breaks the whole executor: the next submit() fails, or pending
+    futures fail, with BrokenProcessPool. Either drops the broken executor so the next
+    task starts a fresh one; a submit() that hit a broken executor is retried once.
+    """
+
+    def __init__(self, workers: int):
+        self.workers = workers
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def _current(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context('spawn')
+                )
+                for _ in range(self.workers):
+                    self._executor.submit(_warm_up)
+            return self._executor
+
+    def _discard(self, executor: ProcessPoolExecutor) -> None:
+        # A broken executor has already terminated its processes
+        with self._lock:
+            if self._executor is executor:
+                self._executor = None
+
+    def submit(self, fn, /, *args, **kwargs) -> Future:
+        executor = self._current()
+        try:
+            future = executor.submit(fn, *args, **kwargs)
+        except BrokenProcessPool:
+            self._discard(executor)
+            executor = self._current()
+            future = executor.submit(fn, *args, **kwargs)
+
+        def discard_if_broken(done: Future) -> None:
+            if not done.cancelled() and isinstance(done.exception(), BrokenProcessPool):
+                self._discard(executor)
+
+        future.add_done_callback(discard_if_broken)
+        return future
+
+    def shutdown(self, wait: bool = True, *, cancel_futures: bool = False) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait, cancel_futures=cancel_futures)
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_solver_pool() -> Optional[SolverPool]:
+    """Return the shared solver pool, or None when parallel solving is disabled"""
+    global _pool
+    workers = getattr(settings, 'ITINERARY_SOLVER_WORKERS', 0)
+    if workers <= 0:
+        return None
+    with _pool_lock:
+        if _pool is None:
+            _pool = SolverPool(workers)
+        return _pool
+
+
+def executor_for_days(num_days: int) -> Optional[SolverPool]:
+    """Pool to refine a trip of `num_days` days with, or None to refine serially"""
+    if num_days < PARALLEL_MIN_DAYS:
+        return None
+    return get_solver_pool()
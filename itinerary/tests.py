@@ -0,0 +1,288 @@
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, time as clock, timedelta, timezone
+from decimal import Decimal
+from itertools import permutations
+
+import numpy as np
+from django.contrib.auth.models import User
+from django.test import SimpleTestCase, override_settings
+from rest_framework.test import APITestCase
+
+from .distance_matrix import build_distance_matrix, build_travel_time_matrix
+from .exact_solver import held_karp_order
+from .local_search import improve_route, route_cost
+from .models import TripPlan
+from .timeline import ITEM_BREAK, ITEM_LOCATION, ITEM_TRAVEL, ISO_TIMES, build_timeline
+from .vrptw import (
+    RoutingProblem, DaySlackIndex, MINUTES_PER_DAY, refine_day_route, solve_multi_start, solve_schedule,
+)
+
+
+def random_points(rng: random.Random, n: int, spread: float = 0.5):
+    """Start point plus `n` stops scattered around Mysore"""
+    return [
+        {'latitude': 12.3 + rng.uniform(-spread, spread), 'longitude': 76.6 + rng.uniform(-spread, spread)}
+        for _ in range(n + 1)
+    ]
+
+
+def random_problem(rng: random.Random, n: int, num_days: int = 1, windows: bool = True,
+                   day_start: int = 8 * 60, day_end: int = 20 * 60) -> RoutingProblem:
+    """A routing problem over random stops with random durations and (optionally) opening hours"""
+    distances = build_distance_matrix(random_points(rng, n))
+    opens, closes = [0], [MINUTES_PER_DAY]
+    for _ in range(n):
+        if windows and rng.random() < 0.5:
+            opens.append(rng.choice([9, 10, 11, 14]) * 60)
+            closes.append(rng.choice([13, 17, 18]) * 60)
+        else:
+            opens.append(0)
+            closes.append(MINUTES_PER_DAY)
+    return RoutingProblem(
+        distances, build_travel_time_matrix(distances),
+        durations=[0] + [rng.choice([30, 45, 60, 90]) for _ in range(n)],
+        opens=opens, closes=closes,
+        day_start=day_start, day_end=day_end, num_days=num_days,
+    )
+
+
+def feasible_routes(rng: random.Random, problem: RoutingProblem, count: int):
+    """Up to `count` random feasible single-day routes (prefixes of shuffled stops)"""
+    routes = []
+    for _ in range(count):
+        stops = rng.sample(range(1, problem.num_stops + 1), problem.num_stops)
+        route = []
+        for stop in stops:
+            if problem.simulate(route + [stop]) is not None:
+                route.append(stop)
+        routes.append(route)
+    return routes
+
+
+class HeldKarpTests(SimpleTestCase):
+    """The exact solver must match a brute-force search of every order"""
+
+    def test_optimal_against_brute_force(self):
+        rng = random.Random(9)
+        for n in range(1, 9):
+            for trial in range(3):
+                distances = build_distance_matrix(random_points(rng, n))
+                with self.subTest(stops=n, trial=trial):
+                    order = held_karp_order(distances)
+                    self.assertEqual(sorted(order), list(range(1, n + 1)))
+                    best = min(route_cost(distances, [0, *p]) for p in permutations(range(1, n + 1)))
+                    self.assertAlmostEqual(route_cost(distances, [0] + order), best, places=6)
+
+    def test_open_route(self):
+        # Collinear stops: the optimal open route walks outwards and never returns to the start
+        distances = build_distance_matrix([{'latitude': 12.0, 'longitude': 76.0 + x} for x in (0, 0.3, 0.1, 0.2)])
+        self.assertEqual(held_karp_order(distances), [2, 3, 1])
+
+    def test_asymmetric_matrix(self):
+        rng = np.random.default_rng(3)
+        distances = rng.uniform(1, 50, size=(7, 7))
+        np.fill_diagonal(distances, 0)
+        order = held_karp_order(distances)
+        best = min(route_cost(distances, [0, *p]) for p in permutations(range(1, 7)))
+        self.assertAlmostEqual(route_cost(distances, [0] + order), best, places=6)
+
+
+class LocalSearchTests(SimpleTestCase):
+    """2-opt / Or-opt refinement only ever shortens a route"""
+
+    def test_never_worse(self):
+        rng = random.Random(2)
+        for n in (2, 3, 5, 10, 25, 60):
+            for trial in range(5):
+                distances = build_distance_matrix(random_points(rng, n))
+                route = [0] + rng.sample(range(1, n + 1), n)
+                with self.subTest(stops=n, trial=trial):
+                    improved = improve_route(distances, route, time_budget_ms=1000)
+                    self.assertEqual(improved[0], 0)
+                    self.assertEqual(sorted(improved), sorted(route))
+                    self.assertLessEqual(route_cost(distances, improved), route_cost(distances, route) + 1e-9)
+
+    def test_reaches_optimum_on_small_routes(self):
+        # A reversed line is fixed by a single 2-opt move
+        distances = build_distance_matrix([{'latitude': 12.0, 'longitude': 76.0 + x / 10} for x in range(6)])
+        self.assertEqual(improve_route(distances, [0, 5, 4, 3, 2, 1]), [0, 1, 2, 3, 4, 5])
+
+    def test_refined_days_stay_feasible(self):
+        rng = random.Random(5)
+        for trial in range(20):
+            problem = random_problem(rng, rng.randint(4, 16), num_days=2)
+            routes, _ = solve_schedule(problem, improve=False)
+            for route in routes:
+                if len(route) < 2:
+                    continue
+                sub = problem.subproblem([0] + route)
+                original = list(range(1, len(route) + 1))
+                with self.subTest(trial=trial, route=route):
+                    refined = refine_day_route(sub, wall_deadline=time.time() + 1)
+                    self.assertEqual(sorted(refined), original)
+                    self.assertIsNotNone(sub.simulate(refined))
+                    self.assertLessEqual(sub.route_distance(refined), sub.route_distance(original) + 1e-9)
+
+    def test_expired_deadline_keeps_route(self):
+        rng = random.Random(4)
+        distances = build_distance_matrix(random_points(rng, 20))
+        route = [0] + list(range(1, 21))
+        self.assertEqual(improve_route(distances, route, deadline=0.0), route)
+
+
+class MultiStartTests(SimpleTestCase):
+    """Seeded multi-start is reproducible and never loses a stop"""
+
+    def assertCoversEveryStop(self, problem, routes, unscheduled):
+        visits = [stop for route in routes for stop in route] + [stop for stop, _ in unscheduled]
+        self.assertEqual(sorted(visits), list(range(1, problem.num_stops + 1)))
+        for route in routes:
+            self.assertIsNotNone(problem.simulate(route))
+
+    def test_same_seed_same_schedule(self):
+        rng = random.Random(12)
+        for trial in range(5):
+            problem = random_problem(rng, rng.randint(6, 20), num_days=rng.randint(1, 3))
+            with self.subTest(trial=trial):
+                first = solve_multi_start(problem, starts=4, seed=7, time_budget_ms=10000)
+                second = solve_multi_start(problem, starts=4, seed=7, time_budget_ms=10000)
+                self.assertEqual(first, second)
+                self.assertCoversEveryStop(problem, *first)
+
+    def test_executor_matches_serial(self):
+        rng = random.Random(13)
+        problem = random_problem(rng, 15, num_days=2)
+        serial = solve_multi_start(problem, starts=4, seed=3, time_budget_ms=10000)
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            pooled = solve_multi_start(problem, starts=4, seed=3, time_budget_ms=10000, executor=executor)
+        self.assertEqual(serial, pooled)
+
+    def test_never_schedules_fewer_than_single_start(self):
+        rng = random.Random(14)
+        for trial in range(5):
+            problem = random_problem(rng, rng.randint(10, 25), num_days=2, day_end=16 * 60)
+            with self.subTest(trial=trial):
+                _, single = solve_schedule(problem, time_budget_ms=10000)
+                routes, unscheduled = solve_multi_start(problem, starts=4, seed=trial, time_budget_ms=10000)
+                self.assertLessEqual(len(unscheduled), len(single))
+                self.assertCoversEveryStop(problem, routes, unscheduled)
+
+
+class DaySlackIndexTests(SimpleTestCase):
+    """The O(1) insertion screen may only reject insertions simulation rejects too"""
+
+    def test_never_rejects_feasible_insertion(self):
+        rng = random.Random(14)
+        checked = 0
+        for trial in range(40):
+            problem = random_problem(rng, rng.randint(4, 14), day_end=rng.choice([15, 18, 20]) * 60)
+            for route in feasible_routes(rng, problem, 3):
+                index = DaySlackIndex(problem, route)
+                for stop in set(range(1, problem.num_stops + 1)) - set(route):
+                    for pos in range(len(route) + 1):
+                        if problem.simulate(route[:pos] + [stop] + route[pos:]) is not None:
+                            checked += 1
+                            with self.subTest(trial=trial, route=route, pos=pos, stop=stop):
+                                self.assertTrue(index.can_insert(pos, stop))
+        self.assertGreater(checked, 100)
+
+    def test_rejects_stop_closed_all_day(self):
+        rng = random.Random(15)
+        problem = random_problem(rng, 3, windows=False)
+        problem.opens[3], problem.closes[3] = 21 * 60, 22 * 60
+        index = DaySlackIndex(problem, [1, 2])
+        for pos in range(3):
+            self.assertFalse(index.can_insert(pos, 3))
+
+
+class TimelineTests(SimpleTestCase):
+    """build_timeline must agree with RoutingProblem.simulate"""
+
+    def test_matches_simulate(self):
+        rng = random.Random(16)
+        for trial in range(30):
+            problem = random_problem(rng, rng.randint(3, 10))
+            for route in feasible_routes(rng, problem, 2) + [rng.sample(range(1, problem.num_stops + 1), 3)]:
+                with self.subTest(trial=trial, route=route):
+                    timeline = build_timeline(problem, route)
+                    finish = problem.simulate(route)
+                    if finish is None:
+                        self.assertIsNone(timeline)
+                        continue
+                    visits = [item for item in timeline if item.kind == ITEM_LOCATION]
+                    self.assertEqual([item.stop for item in visits], route)
+                    self.assertEqual(visits[-1].end if visits else problem.day_start, finish)
+                    self.assertLessEqual(sum(item.kind == ITEM_BREAK for item in timeline), 1)
+                    for item, following in zip(timeline, timeline[1:]):
+                        self.assertLessEqual(item.start, item.end)
+                        self.assertLessEqual(item.end, following.start)
+                    for item in visits:
+                        self.assertEqual(item.duration, problem.durations[item.stop])
+                        self.assertGreaterEqual(item.start, problem.opens[item.stop])
+                        self.assertLessEqual(item.end, min(problem.closes[item.stop], problem.day_end))
+
+    def test_to_dict(self):
+        points = [
+            {'latitude': 12.30, 'longitude': 76.60, 'name': 'Hotel'},
+            {'latitude': 12.35, 'longitude': 76.65, 'id': 4, 'type': 'gi', 'name': 'Palace'},
+        ]
+        distances = build_distance_matrix(points)
+        problem = RoutingProblem(
+            distances, build_travel_time_matrix(distances),
+            durations=[0, 90], opens=[0, 600], closes=[MINUTES_PER_DAY, 1080],
+            day_start=540, day_end=1200, num_days=1,
+        )
+        travel, visit = [item.to_dict(problem, points) for item in build_timeline(problem, [1])]
+        self.assertEqual(travel['type'], ITEM_TRAVEL)
+        self.assertEqual(travel['start_time'], '09:00:00')
+        self.assertEqual(travel['distance'], round(distances[0][1], 2))
+        self.assertEqual(visit['type'], ITEM_LOCATION)
+        self.assertEqual((visit['location_id'], visit['location_type']), (4, 'gi'))
+        self.assertEqual((visit['start_time'], visit['end_time'], visit['duration']), ('10:00:00', '11:30:00', 90))
+        self.assertEqual(ISO_TIMES[MINUTES_PER_DAY - 1], '23:59:00')
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}})
+class TripKeysetPaginationTests(APITestCase):
+    """Trip cursor pages (newest first) across equal and microsecond-apart created_at"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='traveller', password='pass')
+        other = User.objects.create_user(username='other', password='pass')
+        TripPlan.objects.bulk_create([
+            TripPlan(
+                user=other if i % 10 == 0 else cls.user, title=f'Trip {i}', start_location_name='Hotel',
+                start_latitude=Decimal('12.3'), start_longitude=Decimal('76.6'),
+                start_date=date(2024, 1, 1), start_time=clock(9), end_time=clock(18),
+            )
+            for i in range(130)
+        ])
+        # auto_now_add is set on save; pin the timestamps so page boundaries fall inside ties
+        base = datetime(2024, 1, 1, 12, tzinfo=timezone.utc)
+        for i, pk in enumerate(TripPlan.objects.order_by('id').values_list('id', flat=True)):
+            TripPlan.objects.filter(id=pk).update(created_at=base + timedelta(microseconds=i // 40))
+
+    def test_walk_forward_and_back(self):
+        self.client.force_authenticate(self.user)
+        expected = list(
+            TripPlan.objects.filter(user=self.user).order_by('-created_at', '-id').values_list('id', flat=True)
+        )
+        pages, url = [], '/api/trips/?cursor='
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200, response.content)
+            pages.append(response.json())
+            url = pages[-1]['next']
+        self.assertEqual([trip['id'] for page in pages for trip in page['results']], expected)
+        self.assertEqual(len(pages), 3)
+
+        # Walking back from the last page revisits every earlier page
+        url = pages[-1]['previous']
+        for page in pages[-2::-1]:
+            data = self.client.get(url).json()
+            self.assertEqual(data['results'], page['results'])
+            url = data['previous']
+        self.assertIsNone(url)
@@ -0,0 +1,102 @@
+"""
+Day Timeline
+Expands a routed day into travel / break / location items in integer minutes.
+Items are compact __slots__ objects so any solver can walk or compare timelines
+cheaply; times become 'HH:MM:SS' strings only in to_dict(), via a lookup table.
+"""
+from typing import Any, Dict, List, Optional
+
+from .vrptw import RoutingProblem, BUFFER_TIME_MINS, LUNCH_BREAK_DURATION, MINUTES_PER_DAY
+
+
+ITEM_TRAVEL = 'travel'
+ITEM_BREAK = 'break'
+ITEM_LOCATION = 'location'
+
+# ISO_TIMES[m] == datetime.time(m // 60, m % 60).isoformat()
+ISO_TIMES = tuple(f'{m // 60:02d}:{m % 60:02d}:00' for m in range(MINUTES_PER_DAY))
+
+
+class TimelineItem:
+    """One timeline entry; `stop` is the visited (or travelled-to) matrix index"""
+
+    __slots__ = ('kind', 'start', 'end', 'stop', 'from_stop')
+
+    def __init__(self, kind: str, start: int, end: int, stop: int = 0, from_stop: int = 0):
+        self.kind = kind
+        self.start = start
+        self.end = end
+        self.stop = stop
+        self.from_stop = from_stop
+
+    @property
+    def duration(self) -> int:
+        return self.end - self.start
+
+    def to_dict(self, problem: RoutingProblem, points: List[Dict]) -> Dict[str, Any]:
+        """Serialize to the API item format"""
+        if self.kind == ITEM_TRAVEL:
+            return {
+                'type': ITEM_TRAVEL,
+                'start_time': ISO_TIMES[self.start],
+                'end_time': ISO_TIMES[self.end],
+                'duration': self.end - self.start,
+                'distance': round(problem.distance[self.from_stop][self.stop], 2)
+            }
+        if self.kind == ITEM_BREAK:
+            return {
+                'type': ITEM_BREAK,
+                'name': 'Lunch Break',
+                'start_time': ISO_TIMES[self.start],
+                'end_time': ISO_TIMES[self.end],
+                'duration': self.end - self.start
+            }
+        location = points[self.stop]
+        return {
+            'type': ITEM_LOCATION,
+            'location': location,
+            'location_id': location.get('id'),
+            'location_type': location.get('type'),  # 'gi' or 'ad'
+            'start_time': ISO_TIMES[self.start],
+            'end_time': ISO_TIMES[self.end],
+            'duration': self.end - self.start
+        }
+
+
+def build_timeline(problem: RoutingProblem, route: List[int]) -> Optional[List[TimelineItem]]:
+    """
+    Timeline of a day's route, or None if the route breaks a time window
+    Mirrors RoutingProblem.advance() with plain integers instead of DayState objects.
+    """
+    travel = problem.travel
+    durations = problem.durations
+    opens = problem.opens
+    closes = problem.closes
+    day_end = problem.day_end
+
+    items = []
+    now = problem.day_start
+    location = 0
+    lunch_taken = False
+
+    for stop in route:
+        travel_mins = travel[location][stop]
+        if travel_mins > 0:
+            items.append(TimelineItem(ITEM_TRAVEL, now, now + travel_mins, stop, location))
+
+        arrival = now + travel_mins + BUFFER_TIME_MINS
+        duration = durations[stop]
+        start = max(arrival, opens[stop])
+        if problem.lunch_due(lunch_taken, arrival, start, duration):
+            lunch_taken = True
+            items.append(TimelineItem(ITEM_BREAK, arrival, arrival + LUNCH_BREAK_DURATION))
+            start = max(arrival + LUNCH_BREAK_DURATION, opens[stop])
+
+        end = start + duration
+        if end > closes[stop] or end > day_end:
+            return None
+        items.append(TimelineItem(ITEM_LOCATION, start, end, stop))
+        now = end
+        location = stop
+
+    return items
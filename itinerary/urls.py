@@ -1,9 +1,10 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import TripPlanViewSet
+from .views import TripPlanViewSet, ScheduleJobViewSet
 
 router = DefaultRouter()
 router.register(r'trips', TripPlanViewSet, basename='tripplan')
+router.register(r'schedule-jobs', ScheduleJobViewSet, basename='schedulejob')
 
 urlpatterns = [
     path('', include(router.urls)),
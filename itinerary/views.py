@@ -2,22 +2,38 @@ from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated, IsAuthenticatedOrReadOnly
+from django.conf import settings
+from django.db import transaction
 from django.shortcuts import get_object_or_404
-from .models import TripPlan, TripDay, ScheduleItem, SelectedLocation
+from .models import TripPlan, TripDay, ScheduleItem, SelectedLocation, ScheduleJob
 from .serializers import (
     TripPlanSerializer, TripPlanCreateSerializer,
-    TripDaySerializer, ScheduleItemSerializer, SelectedLocationSerializer
+    TripDaySerializer, ScheduleItemSerializer, SelectedLocationSerializer,
+    ScheduleJobSerializer
 )
+from .incremental import add_stop, remove_stop
+from .jobs import enqueue_schedule_job
+from .persistence import generate_and_save_schedule
+from .schedule_generator import STRATEGY_LOCAL_SEARCH, ROUTE_STRATEGIES, InfeasibleScheduleError
+from .vrptw import DEFAULT_SOLVER_BUDGET_MS
 from home.models import GILocation
 from adver.models import AdLocation
 
 
+# Upper bound for client-supplied solver budgets so a request cannot hold a worker indefinitely
+MAX_SOLVER_BUDGET_MS = 5000
+# Upper bound for multi-start runs per request
+MAX_SOLVER_STARTS = 32
+
+
 class TripPlanViewSet(viewsets.ModelViewSet):
     """
-    ViewSet for Trip Plans (without route optimization)
+    ViewSet for Trip Plans
     """
     serializer_class = TripPlanSerializer
     permission_classes = [IsAuthenticated]
+    # Keyset pages (?cursor=) follow the model's newest-first ordering
+    cursor_ordering = ['-created_at', '-id']
     
     def get_queryset(self):
         """Return trips for current user only"""
@@ -28,10 +44,18 @@ class TripPlanViewSet(viewsets.ModelViewSet):
             return TripPlanCreateSerializer
         return TripPlanSerializer
     
+    @staticmethod
+    def _with_schedule_update(data, update):
+        """Report how a saved schedule was updated after an edit ('incremental' or 'full')"""
+        if update:
+            data['schedule_update'] = update
+        return data
+    
     @action(detail=True, methods=['post'])
     def add_location(self, request, pk=None):
         """
         Add a location to the trip
+        A saved schedule gets the new stop inserted into its cheapest feasible day
         """
         trip_plan = self.get_object()
         gi_location_id = request.data.get('gi_location_id')
@@ -40,11 +64,15 @@ class TripPlanViewSet(viewsets.ModelViewSet):
         if gi_location_id:
             try:
                 gi_location = GILocation.objects.get(id=gi_location_id)
-                SelectedLocation.objects.create(
-                    trip_plan=trip_plan,
-                    gi_location=gi_location
-                )
-                return Response({'message': 'GI Location added successfully'})
+                with transaction.atomic():
+                    selected_location = SelectedLocation.objects.create(
+                        trip_plan=trip_plan,
+                        gi_location=gi_location
+                    )
+                    update = add_stop(trip_plan, selected_location)
+                return Response(self._with_schedule_update(
+                    {'message': 'GI Location added successfully'}, update
+                ))
             except GILocation.DoesNotExist:
                 return Response(
                     {'error': 'GI Location not found'},
@@ -54,11 +82,15 @@ class TripPlanViewSet(viewsets.ModelViewSet):
         elif ad_location_id:
             try:
                 ad_location = AdLocation.objects.get(id=ad_location_id)
-                SelectedLocation.objects.create(
-                    trip_plan=trip_plan,
-                    ad_location=ad_location
-                )
-                return Response({'message': 'Ad Location added successfully'})
+                with transaction.atomic():
+                    selected_location = SelectedLocation.objects.create(
+                        trip_plan=trip_plan,
+                        ad_location=ad_location
+                    )
+                    update = add_stop(trip_plan, selected_location)
+                return Response(self._with_schedule_update(
+                    {'message': 'Ad Location added successfully'}, update
+                ))
             except AdLocation.DoesNotExist:
                 return Response(
                     {'error': 'Ad Location not found'},
@@ -74,19 +106,84 @@ class TripPlanViewSet(viewsets.ModelViewSet):
     def remove_location(self, request, pk=None):
         """
         Remove a location from the trip
+        A saved schedule has the stop spliced out and only that day re-timed
         """
         trip_plan = self.get_object()
         selected_location_id = request.data.get('selected_location_id')
         
         try:
-            selected_location = SelectedLocation.objects.get(
-                id=selected_location_id,
-                trip_plan=trip_plan
-            )
-            selected_location.delete()
-            return Response({'message': 'Location removed successfully'})
+            with transaction.atomic():
+                selected_location = SelectedLocation.objects.select_for_update().get(
+                    id=selected_location_id,
+                    trip_plan=trip_plan
+                )
+                # Deletes the selection and takes exactly its visit out of the schedule
+                update = remove_stop(trip_plan, selected_location)
+            return Response(self._with_schedule_update(
+                {'message': 'Location removed successfully'}, update
+            ))
         except SelectedLocation.DoesNotExist:
             return Response(
                 {'error': 'Selected location not found'},
                 status=status.HTTP_404_NOT_FOUND
             )
+    
+    @action(detail=True, methods=['post'])
+    def generate_schedule(self, request, pk=None):
+        """
+        Generate an optimized schedule and save it as the trip's days and items
+        Optional body: strategy ('nearest_neighbor' | 'local_search'), time_budget_ms,
+        starts (best of N seeded constructions, default 1), seed (default 0),
+        sync (true to generate in the request instead of queueing it)
+        The work is queued for run_schedule_worker and a job to poll is returned
+        with 202, unless sync is sent or ITINERARY_SCHEDULE_JOBS is off.
+        """
+        trip_plan = self.get_object()
+        strategy = request.data.get('strategy', STRATEGY_LOCAL_SEARCH)
+        
+        try:
+            time_budget_ms = int(request.data.get('time_budget_ms', DEFAULT_SOLVER_BUDGET_MS))
+            starts = int(request.data.get('starts', 1))
+            seed = int(request.data.get('seed', 0))
+        except (TypeError, ValueError):
+            return Response(
+                {'error': 'time_budget_ms, starts and seed must be integers'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        time_budget_ms = max(0, min(time_budget_ms, MAX_SOLVER_BUDGET_MS))
+        starts = max(1, min(starts, MAX_SOLVER_STARTS))
+        if strategy not in ROUTE_STRATEGIES:
+            return Response(
+                {'error': f"Unknown route strategy '{strategy}'. Choose from: {', '.join(ROUTE_STRATEGIES)}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        sync = str(request.data.get('sync', '')).lower() in ('true', '1')
+        if settings.ITINERARY_SCHEDULE_JOBS and not sync:
+            job = enqueue_schedule_job(trip_plan, strategy, time_budget_ms, starts, seed)
+            return Response(
+                ScheduleJobSerializer(job).data,
+                status=status.HTTP_202_ACCEPTED
+            )
+        
+        try:
+            schedule = generate_and_save_schedule(trip_plan, strategy, time_budget_ms, starts, seed)
+        except InfeasibleScheduleError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        
+        return Response({
+            'message': 'Schedule generated successfully',
+            'schedule': schedule
+        })
+
+
+class ScheduleJobViewSet(viewsets.ReadOnlyModelViewSet):
+    """
+    ViewSet for polling background schedule generation jobs
+    """
+    serializer_class = ScheduleJobSerializer
+    permission_classes = [IsAuthenticated]
+    
+    def get_queryset(self):
+        """Return jobs for the current user's trips only"""
+        return ScheduleJob.objects.filter(trip_plan__user=self.request.user)
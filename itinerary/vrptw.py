@@ -0,0 +1,498 @@
+"""
+Time-Window Scheduler (VRPTW)
+Assigns stops to trip days and orders them so every visit respects the location's
+opening hours, the trip's daily start/end time and the lunch break.
+All times are integer minutes since midnight. Every day starts from the trip start
+point, which is index 0 of the distance / travel-time matrices.
+"""
+import random
+import time
+from concurrent.futures import Executor, wait
+from concurrent.futures.process import BrokenProcessPool
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from .clustering import cluster_stops
+from .exact_solver import held_karp_order, EXACT_SOLVER_THRESHOLD
+from .local_search import improve_route, route_cost
+
+
+BUFFER_TIME_MINS = 15
+LUNCH_EARLIEST_START = 690  # 11:30
+LUNCH_BREAK_START = 780  # 13:00
+LUNCH_LATEST_START = 900  # 15:00
+LUNCH_BREAK_DURATION = 60
+MINUTES_PER_DAY = 24 * 60
+DEFAULT_SOLVER_BUDGET_MS = 500
+# Randomized constructions pick among this many nearest feasible stops
+RANDOMIZED_CANDIDATES = 3
+
+# Reasons reported for stops that could not be placed on any day
+UNSCHEDULED_OUTSIDE_HOURS = 'outside_opening_hours'
+UNSCHEDULED_NO_TIME_LEFT = 'no_time_left'
+
+
+class DayState:
+    """Position in a day's timeline after the last scheduled stop"""
+
+    __slots__ = ('time', 'location', 'lunch_taken')
+
+    def __init__(self, time: int, location: int = 0, lunch_taken: bool = False):
+        self.time = time
+        self.location = location
+        self.lunch_taken = lunch_taken
+
+
+class RoutingProblem:
+    """
+    Integer-minute description of a trip for the solver
+    Per-stop lists are indexed by matrix index; index 0 (the start point) is unused.
+    """
+
+    def __init__(self, distance_matrix: np.ndarray, travel_matrix: np.ndarray,
+                 durations: List[int], opens: List[int], closes: List[int],
+                 day_start: int, day_end: int, num_days: int):
+        self.distance_matrix = distance_matrix
+        self.distance = distance_matrix.tolist()
+        self.travel = travel_matrix.tolist()
+        self.durations = durations
+        self.opens = opens
+        self.closes = closes
+        self.day_start = day_start
+        self.day_end = day_end
+        self.num_days = num_days
+
+    @property
+    def num_stops(self) -> int:
+        return len(self.durations) - 1
+
+    @staticmethod
+    def lunch_due(lunch_taken: bool, arrival: int, visit_start: int, duration: int) -> bool:
+        """Lunch is taken before the first visit that would run past LUNCH_BREAK_START"""
+        return (
+            not lunch_taken
+            and LUNCH_EARLIEST_START <= arrival <= LUNCH_LATEST_START
+            and visit_start + duration > LUNCH_BREAK_START
+        )
+
+    def advance(self, state: DayState, stop: int) -> Optional[DayState]:
+        """
+        Travel to and visit `stop` from `state`
+        Returns the new state, or None if the visit cannot fit its time window
+        """
+        arrival = state.time + self.travel[state.location][stop] + BUFFER_TIME_MINS
+        duration = self.durations[stop]
+        lunch_taken = state.lunch_taken
+
+        start = max(arrival, self.opens[stop])
+        if self.lunch_due(lunch_taken, arrival, start, duration):
+            lunch_taken = True
+            start = max(arrival + LUNCH_BREAK_DURATION, self.opens[stop])
+
+        end = start + duration
+        if end > self.closes[stop] or end > self.day_end:
+            return None
+        return DayState(end, stop, lunch_taken)
+
+    def simulate(self, route: List[int]) -> Optional[int]:
+        """Return the finish time of a day's route, or None if it is infeasible"""
+        state = DayState(self.day_start)
+        for stop in route:
+            state = self.advance(state, stop)
+            if state is None:
+                return None
+        return state.time
+
+    def route_travel_minutes(self, route: List[int]) -> int:
+        """Driving minutes of a day's route, starting at the trip start point"""
+        legs = [0] + route
+        return sum(self.travel[a][b] for a, b in zip(legs, legs[1:]))
+
+    def route_distance(self, route: List[int]) -> float:
+        return route_cost(self.distance_matrix, [0] + route)
+
+    def subproblem(self, nodes: List[int]) -> 'RoutingProblem':
+        """Problem restricted to `nodes` (nodes[0] must be the start point), re-indexed 0..n"""
+        sub = RoutingProblem.__new__(RoutingProblem)
+        sub.distance_matrix = self.distance_matrix[np.ix_(nodes, nodes)]
+        sub.distance = sub.distance_matrix.tolist()
+        sub.travel = [[self.travel[i][j] for j in nodes] for i in nodes]
+        sub.durations = [self.durations[i] for i in nodes]
+        sub.opens = [self.opens[i] for i in nodes]
+        sub.closes = [self.closes[i] for i in nodes]
+        sub.day_start = self.day_start
+        sub.day_end = self.day_end
+        sub.num_days = 1
+        return sub
+
+    def stop_demands(self, stops: List[int]) -> np.ndarray:
+        """Minutes each stop is expected to take from its day: visit, buffer and nearest leg"""
+        travel = np.asarray(self.travel, dtype=np.float64)[np.ix_(stops, stops)]
+        np.fill_diagonal(travel, np.inf)
+        nearest_travel = travel.min(axis=1) if len(stops) > 1 else np.zeros(len(stops))
+        durations = np.array([self.durations[s] for s in stops], dtype=np.float64)
+        return durations + BUFFER_TIME_MINS + nearest_travel
+
+
+class DaySlackIndex:
+    """
+    Forward / backward time-slack arrays of one feasible day, for O(1) insertion checks
+    For route position k: arrival[k], start[k] and end[k] of the visit, latest[k]
+    (latest start keeping the rest of the day feasible with lunch where it is now),
+    latest_free[k] (the same if the day's remaining lunch were dropped) and
+    slack[k] = latest[k] - start[k]; lunch_at is the position lunch is taken before
+    (None if the day has no lunch).
+    can_insert() never rejects a feasible insertion, but lunch can shift once a day is
+    delayed, so a positive answer must still be confirmed with RoutingProblem.simulate().
+    """
+
+    __slots__ = ('problem', 'route', 'arrival', 'start', 'end', 'lunch_at',
+                 'latest', 'latest_free', 'slack')
+
+    def __init__(self, problem: 'RoutingProblem', route: List[int]):
+        self.problem = problem
+        self.route = route
+        n = len(route)
+        self.arrival = [0] * n
+        self.start = [0] * n
+        self.end = [0] * n
+        self.lunch_at = None
+        self.latest = [0] * n
+        self.latest_free = [0] * n
+
+        travel = problem.travel
+        now = problem.day_start
+        location = 0
+        for k, stop in enumerate(route):
+            arrival = now + travel[location][stop] + BUFFER_TIME_MINS
+            start = max(arrival, problem.opens[stop])
+            if problem.lunch_due(self.lunch_at is not None, arrival, start, problem.durations[stop]):
+                self.lunch_at = k
+                start = max(arrival + LUNCH_BREAK_DURATION, problem.opens[stop])
+            self.arrival[k] = arrival
+            self.start[k] = start
+            now = self.end[k] = start + problem.durations[stop]
+            location = stop
+
+        for k in range(n - 1, -1, -1):
+            stop = route[k]
+            latest = latest_free = min(problem.closes[stop], problem.day_end) - problem.durations[stop]
+            if k + 1 < n:
+                gap = travel[stop][route[k + 1]] + BUFFER_TIME_MINS + problem.durations[stop]
+                lunch = LUNCH_BREAK_DURATION if self.lunch_at == k + 1 else 0
+                latest = min(latest, self.latest[k + 1] - gap - lunch)
+                latest_free = min(latest_free, self.latest_free[k + 1] - gap)
+            self.latest[k] = latest
+            self.latest_free[k] = latest_free
+
+        self.slack = [latest - start for latest, start in zip(self.latest, self.start)]
+
+    def can_insert(self, pos: int, stop: int) -> bool:
+        """Whether `stop` fits before route position `pos` (len(route) = append)"""
+        problem = self.problem
+        if pos > 0:
+            previous, now = self.route[pos - 1], self.end[pos - 1]
+        else:
+            previous, now = 0, problem.day_start
+        lunch_taken = self.lunch_at is not None and self.lunch_at < pos
+
+        arrival = now + problem.travel[previous][stop] + BUFFER_TIME_MINS
+        duration = problem.durations[stop]
+        start = max(arrival, problem.opens[stop])
+        takes_lunch = problem.lunch_due(lunch_taken, arrival, start, duration)
+        if takes_lunch:
+            start = max(arrival + LUNCH_BREAK_DURATION, problem.opens[stop])
+        end = start + duration
+        if end > problem.closes[stop] or end > problem.day_end:
+            return False
+        if pos == len(self.route):
+            return True
+
+        # A lunch still ahead may move or drop out of its window once the day is delayed,
+        # so reject only on the lunch-free bound (equal to latest once lunch is behind)
+        arrival_next = end + problem.travel[stop][self.route[pos]] + BUFFER_TIME_MINS
+        return arrival_next <= self.latest_free[pos]
+
+
+def _nearest_neighbor_day(problem: RoutingProblem, unassigned: set,
+                          candidates: Optional[set] = None,
+                          rng: Optional[random.Random] = None) -> List[int]:
+    """
+    Build one day by repeatedly appending the nearest stop that still fits
+    Only stops in `candidates` (default: all unassigned) are considered. With `rng`
+    the next stop is drawn from the RANDOMIZED_CANDIDATES nearest feasible ones.
+    """
+    route = []
+    state = DayState(problem.day_start)
+    pool = set(unassigned if candidates is None else candidates & unassigned)
+    keep = 1 if rng is None else RANDOMIZED_CANDIDATES
+
+    while pool:
+        row = problem.distance[state.location]
+        feasible = []
+        for stop in sorted(pool, key=lambda s: (row[s], s)):
+            candidate = problem.advance(state, stop)
+            if candidate is not None:
+                feasible.append(candidate)
+                if len(feasible) == keep:
+                    break
+        if not feasible:
+            break
+        next_state = feasible[0] if rng is None else rng.choice(feasible)
+        route.append(next_state.location)
+        unassigned.discard(next_state.location)
+        pool.discard(next_state.location)
+        state = next_state
+
+    return route
+
+
+def best_insertion(problem: RoutingProblem, routes: List[List[int]], stop: int,
+                   day_indexes: Optional[List[int]] = None,
+                   slack: Optional[List[DaySlackIndex]] = None) -> Optional[Tuple[int, int]]:
+    """
+    Cheapest feasible (day index, position) to insert `stop`, or None if it fits nowhere
+    Candidate positions are ranked by O(1) distance delta, screened in O(1) with each
+    day's DaySlackIndex (pass `slack` to reuse them across calls) and confirmed by
+    simulation.
+    """
+    d = problem.distance
+    if day_indexes is None:
+        day_indexes = range(len(routes))
+    if slack is None:
+        slack = [DaySlackIndex(problem, route) for route in routes]
+
+    candidates = []
+    for day_idx in day_indexes:
+        route = routes[day_idx]
+        path = [0] + route
+        for pos in range(len(route) + 1):
+            prev = path[pos]
+            delta = d[prev][stop]
+            if pos < len(route):
+                nxt = path[pos + 1]
+                delta += d[stop][nxt] - d[prev][nxt]
+            candidates.append((delta, day_idx, pos))
+    candidates.sort()
+
+    for _, day_idx, pos in candidates:
+        if not slack[day_idx].can_insert(pos, stop):
+            continue
+        if problem.simulate(routes[day_idx][:pos] + [stop] + routes[day_idx][pos:]) is not None:
+            return day_idx, pos
+    return None
+
+
+def _insert_unassigned(problem: RoutingProblem, routes: List[List[int]],
+                       unassigned: set, deadline: float) -> None:
+    """Cheapest feasible insertion of leftover stops into any day and position"""
+    slack = [DaySlackIndex(problem, route) for route in routes]
+    inserted = True
+
+    while inserted and unassigned and time.perf_counter() < deadline:
+        inserted = False
+        for stop in sorted(unassigned):
+            if time.perf_counter() >= deadline:
+                return
+
+            position = best_insertion(problem, routes, stop, slack=slack)
+            if position is not None:
+                day_idx, pos = position
+                routes[day_idx].insert(pos, stop)
+                slack[day_idx] = DaySlackIndex(problem, routes[day_idx])
+                unassigned.discard(stop)
+                inserted = True
+
+
+def refine_day_route(problem: RoutingProblem, wall_deadline: float) -> List[int]:
+    """
+    Best feasible order for a single-day subproblem whose stops are 1..n
+    Tries the exact Held-Karp order under EXACT_SOLVER_THRESHOLD stops, otherwise
+    (or if that order breaks a time window) 2-opt / Or-opt until `wall_deadline`
+    (time.time() seconds, so it can be passed to worker processes).
+    Returns the original order 1..n when nothing better is feasible.
+    """
+    route = list(range(1, problem.num_stops + 1))
+    current_distance = problem.route_distance(route)
+
+    def acceptable(order: List[int]) -> bool:
+        return (
+            order != route
+            and problem.route_distance(order) < current_distance
+            and problem.simulate(order) is not None
+        )
+
+    if len(route) < EXACT_SOLVER_THRESHOLD:
+        exact = held_karp_order(problem.distance_matrix)
+        if acceptable(exact):
+            return exact
+
+    deadline = time.perf_counter() + max(0.0, wall_deadline - time.time())
+    local = improve_route(problem.distance_matrix, [0] + route, deadline=deadline)[1:]
+    return local if acceptable(local) else route
+
+
+def _improve_days(problem: RoutingProblem, routes: List[List[int]], deadline: float,
+                  executor: Optional[Executor] = None) -> None:
+    """
+    Reorder each day, keeping a change only if it is shorter and feasible
+    Days are independent, so with an `executor` they are refined concurrently; days
+    not finished by the deadline keep their current (best-so-far) order.
+    """
+    wall_deadline = time.time() + max(0.0, deadline - time.perf_counter())
+    day_nodes = [(day_idx, [0] + route) for day_idx, route in enumerate(routes) if len(route) >= 2]
+
+    if executor is not None:
+        try:
+            futures = {
+                executor.submit(refine_day_route, problem.subproblem(nodes), wall_deadline): (day_idx, nodes)
+                for day_idx, nodes in day_nodes
+            }
+        except BrokenProcessPool:
+            executor = None
+        else:
+            done, not_done = wait(futures, timeout=max(0.0, deadline - time.perf_counter()))
+            for future in not_done:
+                future.cancel()
+            # Days whose worker failed (e.g. the pool broke) are refined here if time is left
+            day_nodes = []
+            for future in done:
+                day_idx, nodes = futures[future]
+                if future.exception() is None:
+                    routes[day_idx] = [nodes[i] for i in future.result()]
+                else:
+                    day_nodes.append((day_idx, nodes))
+
+    for day_idx, nodes in day_nodes:
+        if time.perf_counter() >= deadline:
+            break
+        order = refine_day_route(problem.subproblem(nodes), wall_deadline)
+        routes[day_idx] = [nodes[i] for i in order]
+
+
+def solve_schedule(problem: RoutingProblem, improve: bool = True,
+                   time_budget_ms: float = DEFAULT_SOLVER_BUDGET_MS,
+                   cluster_days: bool = True,
+                   executor: Optional[Executor] = None,
+                   seed: Optional[int] = None) -> Tuple[List[List[int]], List[Tuple[int, str]]]:
+    """
+    Assign stops to days and order them respecting every time window
+    1. Nearest-neighbor construction, one day at a time; with `cluster_days` a second
+       construction where each day only draws from its own geographic cluster
+       (capacitated k-medoids) is built too
+    2. Cheapest feasible insertion of leftover stops into any day; the construction
+       scheduling more stops (then driving less) is kept
+    3. Optional per-day refinement (exact Held-Karp for small days, else 2-opt / Or-opt),
+       run concurrently on `executor` when given, followed by another insertion pass
+    Phases 2 and 3 stop at the latency budget; construction always completes.
+    A `seed` randomizes the nearest-neighbor picks (reproducibly, for multi-start).
+    Returns (routes, unscheduled) where routes[d] lists matrix indices for day d + 1
+    and unscheduled holds (matrix index, reason) pairs.
+    """
+    deadline = time.perf_counter() + time_budget_ms / 1000.0
+    rng = None if seed is None else random.Random(seed)
+    unscheduled = []
+    unassigned = set()
+
+    for stop in range(1, problem.num_stops + 1):
+        if problem.simulate([stop]) is None:
+            unscheduled.append((stop, UNSCHEDULED_OUTSIDE_HOURS))
+        else:
+            unassigned.add(stop)
+
+    # Build a day-by-day construction and, for multi-day trips, a cluster-first one;
+    # keep whichever schedules more stops, then whichever drives less
+    constructions = []
+    partitions = [None]
+    if cluster_days and 1 < problem.num_days < len(unassigned):
+        stops = sorted(unassigned)
+        partitions.append(cluster_stops(
+            problem.distance_matrix, stops, problem.stop_demands(stops),
+            capacity=problem.day_end - problem.day_start - LUNCH_BREAK_DURATION,
+            num_clusters=problem.num_days
+        ))
+
+    for groups in partitions:
+        left = set(unassigned)
+        if groups is None:
+            routes = [_nearest_neighbor_day(problem, left, rng=rng) for _ in range(problem.num_days)]
+        else:
+            routes = [_nearest_neighbor_day(problem, left, set(group), rng) for group in groups]
+        _insert_unassigned(problem, routes, left, deadline)
+        total_distance = sum(problem.route_distance(route) for route in routes)
+        constructions.append((len(left), total_distance, routes, left))
+
+    _, _, routes, unassigned = min(constructions, key=lambda c: (c[0], c[1]))
+
+    if improve:
+        _improve_days(problem, routes, deadline, executor)
+        _insert_unassigned(problem, routes, unassigned, deadline)
+
+    unscheduled.extend((stop, UNSCHEDULED_NO_TIME_LEFT) for stop in sorted(unassigned))
+    return routes, unscheduled
+
+
+def _solve_start(problem: RoutingProblem, improve: bool, wall_deadline: float,
+                 seed: Optional[int]) -> Tuple[List[List[int]], List[Tuple[int, str]]]:
+    """One multi-start run, budgeted by an absolute time.time() deadline"""
+    budget_ms = max(0.0, wall_deadline - time.time()) * 1000.0
+    return solve_schedule(problem, improve=improve, time_budget_ms=budget_ms, seed=seed)
+
+
+def solve_multi_start(problem: RoutingProblem, starts: int, seed: int = 0, improve: bool = True,
+                      time_budget_ms: float = DEFAULT_SOLVER_BUDGET_MS,
+                      executor: Optional[Executor] = None) -> Tuple[List[List[int]], List[Tuple[int, str]]]:
+    """
+    Run solve_schedule from `starts` constructions and keep the best
+    Start 0 is the plain deterministic construction; start i > 0 is randomized with
+    seed `seed + i`. The winner schedules the most stops, then has the fewest travel
+    minutes, ties going to the lower start. Random starts run on `executor` when given,
+    and start 0 then has the whole budget, so the result is never worse than a single
+    start; without an executor every start gets `time_budget_ms / starts`, and start 0
+    may be refined less than a single start would be. Random starts unfinished at the
+    deadline are dropped. Results are reproducible for a given seed as long as every
+    start completes.
+    """
+    if starts <= 1:
+        return solve_schedule(problem, improve=improve, time_budget_ms=time_budget_ms, executor=executor)
+
+    wall_deadline = time.time() + time_budget_ms / 1000.0
+    results = {}
+
+    futures = {}
+    if executor is not None:
+        try:
+            futures = {
+                executor.submit(_solve_start, problem, improve, wall_deadline, seed + i): i
+                for i in range(1, starts)
+            }
+        except BrokenProcessPool:
+            futures = {}
+
+    # The deterministic start runs here, in parallel with the pool, on an equal share
+    # of the budget when the random starts run serially after it
+    share = 1 if futures else starts
+    results[0] = _solve_start(problem, improve, time.time() + (wall_deadline - time.time()) / share, None)
+
+    if futures:
+        done, not_done = wait(futures, timeout=max(0.0, wall_deadline - time.time()))
+        for future in not_done:
+            future.cancel()
+        for future in done:
+            if future.exception() is None:
+                results[futures[future]] = future.result()
+    else:
+        for i in range(1, starts):
+            if time.time() >= wall_deadline:
+                break
+            remaining = starts - i
+            results[i] = _solve_start(
+                problem, improve, time.time() + (wall_deadline - time.time()) / remaining, seed + i
+            )
+
+    def score(i: int) -> Tuple[int, int, int]:
+        routes, unscheduled = results[i]
+        return len(unscheduled), sum(problem.route_travel_minutes(route) for route in routes), i
+
+    return results[min(results, key=score)]